@@ -0,0 +1,71 @@
+"""
+Import-time benchmark of the headless meshing path.
+
+Runs `import ezmesh` in fresh interpreters and fails if the median startup time exceeds
+the budget or if any heavy optional module (plotting, notebook widgets, scipy) gets imported.
+
+    python benchmarks/import_time.py --budget 1.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["plotly", "pythreejs", "ipywidgets", "IPython", "scipy"]
+"modules the core meshing path must not import"
+
+IMPORT_STATEMENT = "import ezmesh; from ezmesh import Geometry, CurveLoop, PlaneSurface, export_to_su2"
+
+CHECK_SCRIPT = f"""
+import json, sys
+{IMPORT_STATEMENT}
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def measure_import_time(num_runs: int):
+    "get wall times of importing ezmesh in fresh interpreters"
+    import_times = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", IMPORT_STATEMENT], check=True)
+        import_times.append(time.perf_counter() - start_time)
+    return import_times
+
+
+def measure_baseline_time(num_runs: int):
+    "get wall times of starting an interpreter that imports nothing to subtract from import times"
+    baseline_times = []
+    for _ in range(num_runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline_times.append(time.perf_counter() - start_time)
+    return baseline_times
+
+
+def get_heavy_imports():
+    "get heavy modules imported by the core meshing path"
+    output = subprocess.run([sys.executable, "-c", CHECK_SCRIPT], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=1.0, help="maximum median import time in seconds")
+    parser.add_argument("--runs", type=int, default=7, help="number of fresh interpreters to time")
+    args = parser.parse_args()
+
+    import_time = statistics.median(measure_import_time(args.runs)) - statistics.median(measure_baseline_time(args.runs))
+    heavy_imports = get_heavy_imports()
+
+    print(f"import ezmesh: {import_time*1000:.1f} ms (budget {args.budget*1000:.0f} ms)")
+    if len(heavy_imports) > 0:
+        print(f"heavy modules imported: {', '.join(heavy_imports)}")
+    if import_time > args.budget or len(heavy_imports) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
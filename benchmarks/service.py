@@ -0,0 +1,62 @@
+"""
+Meshing service benchmark of latency and throughput.
+
+Submits concurrent NACA 0012 airfoil jobs to a MeshingService and reports the latency of
+the first progress event and of each job, along with the jobs completed per second.
+
+    python benchmarks/service.py --jobs 16 --workers 4 --mesh-size 0.02
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from ezmesh import CurveLoop, PlaneSurface
+from ezmesh.service import MeshingProgress, MeshingService
+from ezmesh.utils.shapes import generate_circle, generate_naca4_airfoil
+
+
+def get_airfoil_surface(mesh_size: float):
+    "get an airfoil surface with a circular farfield"
+    airfoil_curve_loop = CurveLoop.from_coords(generate_naca4_airfoil("0012", num_points=40), mesh_size=mesh_size, label="airfoil")
+    farfield_curve_loop = CurveLoop.from_coords(generate_circle(40, num_points=40), mesh_size=3.0, label="farfield", holes=[airfoil_curve_loop])
+    return PlaneSurface(outlines=[farfield_curve_loop])
+
+
+async def run_job(service: MeshingService, mesh_size: float):
+    "get the first progress and total latency of a job"
+    start_time = time.perf_counter()
+    first_progress_times = []
+
+    def on_progress(progress: MeshingProgress):
+        if len(first_progress_times) == 0:
+            first_progress_times.append(time.perf_counter() - start_time)
+
+    await service.generate(get_airfoil_surface(mesh_size), on_progress=on_progress)
+    total_time = time.perf_counter() - start_time
+    return first_progress_times[0] if first_progress_times else np.nan, total_time
+
+
+async def run_benchmark(num_jobs: int, num_workers: int, mesh_size: float):
+    service = MeshingService(max_workers=num_workers)
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*[run_job(service, mesh_size) for _ in range(num_jobs)])
+    elapsed_time = time.perf_counter() - start_time
+
+    first_progress_latencies, latencies = np.array(results).T
+    print(f"jobs: {num_jobs}, workers: {num_workers}")
+    print(f"first progress latency p50: {np.nanpercentile(first_progress_latencies, 50):.3f} s")
+    print(f"job latency p50: {np.percentile(latencies, 50):.3f} s, p95: {np.percentile(latencies, 95):.3f} s, max: {latencies.max():.3f} s")
+    print(f"throughput: {num_jobs / elapsed_time:.2f} jobs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=16, help="number of concurrent jobs")
+    parser.add_argument("--workers", type=int, default=4, help="number of worker processes")
+    parser.add_argument("--mesh-size", type=float, default=0.02, help="mesh size at the airfoil")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.jobs, args.workers, args.mesh_size))
+
+
+if __name__ == "__main__":
+    main()
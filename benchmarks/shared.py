@@ -0,0 +1,73 @@
+"""
+Mesh transfer benchmark of shared memory against pickling.
+
+Builds a random triangle mesh, sends it to worker processes once pickled and once as a
+SharedMeshHandle, and reports the time until each worker has the mesh.
+
+    python benchmarks/shared.py --sizes 100000 1000000 --workers 2
+"""
+import argparse
+import multiprocessing
+import pickle
+import time
+import numpy as np
+from ezmesh import ElementType, Mesh
+from ezmesh.shared import SharedMeshHandle
+
+
+def get_random_mesh(num_points: int):
+    "get a mesh of random triangles with a marker and point and cell data"
+    rng = np.random.default_rng(0)
+    elements = list(rng.integers(0, num_points, (2*num_points, 3), dtype=np.uint32))
+    return Mesh(
+        dim=2,
+        elements=elements,
+        element_types=[ElementType.TRIANGLE]*len(elements),
+        points=rng.random((num_points, 3)),
+        markers={"wall": list(rng.integers(0, num_points, (num_points // 100, 2), dtype=np.uint32))},
+        point_data={"pressure": rng.random(num_points)},
+        cell_data={"volume": rng.random(len(elements))},
+    )
+
+
+def receive_pickled(data: bytes):
+    start_time = time.perf_counter()
+    mesh = pickle.loads(data)
+    return time.perf_counter() - start_time, len(mesh.elements)
+
+
+def receive_shared(handle: SharedMeshHandle):
+    start_time = time.perf_counter()
+    mesh = Mesh.from_shared(handle)
+    return time.perf_counter() - start_time, len(mesh.elements)
+
+
+def time_transfer(pool, function, payload, num_workers: int):
+    "get the time until all workers received the payload and the slowest worker's load time"
+    start_time = time.perf_counter()
+    results = pool.map(function, [payload]*num_workers)
+    return time.perf_counter() - start_time, max(load_time for load_time, _ in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000], help="number of mesh points")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    args = parser.parse_args()
+
+    print(f"{'elements':>10} {'pickle (s)':>11} {'export (s)':>11} {'shared (s)':>11} {'attach (s)':>11} {'handle (B)':>11}")
+    with multiprocessing.Pool(args.workers) as pool:
+        for num_points in args.sizes:
+            mesh = get_random_mesh(num_points)
+            pickle_time, _ = time_transfer(pool, receive_pickled, pickle.dumps(mesh), args.workers)
+
+            start_time = time.perf_counter()
+            with mesh.to_shared() as shared_mesh:
+                export_time = time.perf_counter() - start_time
+                shared_time, attach_time = time_transfer(pool, receive_shared, shared_mesh.handle, args.workers)
+                handle_size = len(pickle.dumps(shared_mesh.handle))
+            print(f"{len(mesh.elements):>10} {pickle_time:>11.3f} {export_time:>11.3f} {shared_time:>11.3f} {attach_time:>11.3f} {handle_size:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Structured mesh benchmark of the NumPy transfinite interpolation engine against gmsh.
+
+Meshes a square with TransfiniteCurveField node counts and a TransfiniteSurfaceField
+using ezmesh.structured.generate_structured_mesh and Geometry.generate.
+
+    python benchmarks/structured.py --sizes 100 500 1000
+"""
+import argparse
+import time
+import numpy as np
+from ezmesh import CurveLoop, Geometry, PlaneSurface, TransfiniteCurveField, TransfiniteSurfaceField
+from ezmesh.structured import generate_structured_mesh
+
+
+def get_square_surface(num_cells: int):
+    curve_loop = CurveLoop.from_coords(
+        np.array([[0, 0], [1, 0], [1, 1], [0, 1]]),
+        mesh_size=1.0/num_cells,
+        curve_labels=["bottom", "right", "top", "left"],
+        fields=[TransfiniteCurveField(node_counts=num_cells)]
+    )
+    return PlaneSurface(
+        outlines=[curve_loop],
+        is_quad_mesh=True,
+        fields=[TransfiniteSurfaceField(corners=curve_loop.points)]
+    )
+
+
+def time_structured(num_cells: int, smoothing_iterations: int):
+    surface = get_square_surface(num_cells)
+    start_time = time.perf_counter()
+    mesh = generate_structured_mesh(surface, smoothing_iterations)
+    return time.perf_counter() - start_time, len(mesh.elements)
+
+
+def time_gmsh(num_cells: int):
+    surface = get_square_surface(num_cells)
+    start_time = time.perf_counter()
+    with Geometry() as geometry:
+        mesh = geometry.generate(surface)
+    return time.perf_counter() - start_time, len(mesh.elements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000], help="number of cells per side")
+    parser.add_argument("--smoothing-iterations", type=int, default=0, help="elliptic smoothing iterations")
+    parser.add_argument("--skip-gmsh", action="store_true", help="only time the transfinite interpolation engine")
+    args = parser.parse_args()
+
+    print(f"{'cells':>12} {'structured (s)':>15} {'gmsh (s)':>10} {'speedup':>8}")
+    for num_cells in args.sizes:
+        structured_time, num_elements = time_structured(num_cells, args.smoothing_iterations)
+        if args.skip_gmsh:
+            print(f"{num_elements:>12} {structured_time:>15.3f} {'-':>10} {'-':>8}")
+            continue
+        gmsh_time, _ = time_gmsh(num_cells)
+        print(f"{num_elements:>12} {structured_time:>15.3f} {gmsh_time:>10.3f} {gmsh_time/structured_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Benchmark suite of the meshing pipeline stages with baseline comparison.
+
+Runs parameterized workloads (a NACA 0012 airfoil in a circular farfield, a circle and the
+structured inviscid wedge) at several sizes and records the time and peak Python memory of
+each stage: CurveLoop.from_coords, Geometry.generate, import_from_gmsh, export_to_su2,
+Mesh.get_marker_point and, when pythreejs is installed, visualize_mesh.
+
+Times are the minimum of the repeats. Peak memory is measured in a separate run with
+tracemalloc so it doesn't slow the timed runs, and only covers allocations made by Python
+and NumPy, not gmsh's own. Geometry.generate includes the import of the generated mesh,
+which is also timed on its own as import_from_gmsh.
+
+    # record results of this machine as a baseline
+    python benchmarks/suite.py --output benchmarks/baseline.json
+
+    # compare against the baseline, exits with 1 if any stage regressed
+    python benchmarks/suite.py --baseline benchmarks/baseline.json
+
+Baselines are specific to the machine and environment they were recorded on.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import gmsh
+import numpy as np
+from ezmesh import CurveLoop, Geometry, Mesh, PlaneSurface, TransfiniteCurveField, TransfiniteSurfaceField, export_to_su2
+from ezmesh.geometry import MeshTransaction
+from ezmesh.importers import import_from_gmsh
+from ezmesh.utils.shapes import generate_circle, generate_naca4_airfoil
+
+STAGES = ["CurveLoop.from_coords", "Geometry.generate", "import_from_gmsh", "export_to_su2", "Mesh.get_marker_point", "visualize_mesh"]
+"pipeline stages in the order they run"
+
+MARKER_POINT_PROPORTIONS = np.linspace(0.0, 1.0, 11)
+"proportions of the marker length looked up in the get_marker_point stage"
+
+
+@dataclass
+class Workload:
+    get_transactions: Callable[[int], MeshTransaction]
+    "function of the size that builds the geometry with CurveLoop.from_coords"
+
+    marker_name: str
+    "marker the get_marker_point stage runs on"
+
+
+def get_naca0012_surface(size: int):
+    "NACA 0012 airfoil in a circular farfield, size multiplies the airfoil points and divides the mesh size"
+    airfoil_curve_loop = CurveLoop.from_coords(generate_naca4_airfoil("0012", num_points=40*size), mesh_size=0.02/size, label="airfoil")
+    farfield_curve_loop = CurveLoop.from_coords(generate_circle(20, num_points=40*size)[:-1], mesh_size=2.0/size, label="farfield", holes=[airfoil_curve_loop])
+    return PlaneSurface(outlines=[farfield_curve_loop])
+
+
+def get_circle_surface(size: int):
+    "unstructured disk, size multiplies the boundary points and divides the mesh size"
+    curve_loop = CurveLoop.from_coords(generate_circle(1, num_points=50*size)[:-1], mesh_size=0.05/size, label="wall")
+    return PlaneSurface(outlines=[curve_loop])
+
+
+def get_wedge_surface(size: int):
+    "structured inviscid wedge of the examples, size multiplies the node counts"
+    wedge_curve_loop = CurveLoop.from_coords(
+        np.array([[0, 1], [1.5, 1], [1.5, 0.2], [0.5, 0], [0, 0]]),
+        mesh_size=0.05,
+        curve_labels=["upper", "outlet", "lower/1", "lower/2", "inlet"],
+        fields=[TransfiniteCurveField(node_counts=[30*size, 40*size, 20*size, 10*size, 40*size])]
+    )
+    return PlaneSurface(
+        outlines=[wedge_curve_loop],
+        is_quad_mesh=True,
+        fields=[TransfiniteSurfaceField(corners=[*wedge_curve_loop.get_points("upper"), *wedge_curve_loop.get_points("lower")])]
+    )
+
+
+WORKLOADS = {
+    "naca0012": Workload(get_naca0012_surface, "airfoil"),
+    "circle": Workload(get_circle_surface, "wall"),
+    "wedge": Workload(get_wedge_surface, "lower"),
+}
+
+
+def get_visualize_mesh() -> Optional[Callable[[Mesh], None]]:
+    "get visualize_mesh if its optional dependencies are installed"
+    try:
+        import pythreejs, ipywidgets, IPython  # noqa: F401
+    except ImportError:
+        return None
+    from ezmesh.visualizer import visualize_mesh
+    return visualize_mesh
+
+
+class StageRecorder:
+    "records the time and, if tracing, the peak traced memory of stages"
+
+    def __init__(self, is_tracing: bool) -> None:
+        self.is_tracing = is_tracing
+        self.times: Dict[str, float] = {}
+        self.peak_memories: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def record(self, stage: str):
+        if self.is_tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        yield
+        self.times[stage] = time.perf_counter() - start_time
+        if self.is_tracing:
+            self.peak_memories[stage] = tracemalloc.get_traced_memory()[1] - start_memory
+
+
+def run_pipeline(workload: Workload, size: int, recorder: StageRecorder, output_dir: str):
+    "runs the stages of a workload, returning the number of mesh elements"
+    with recorder.record("CurveLoop.from_coords"):
+        transactions = workload.get_transactions(size)
+
+    with Geometry() as geometry:
+        gmsh.option.set_number("General.Terminal", 0)
+        with recorder.record("Geometry.generate"):
+            mesh = geometry.generate(transactions)
+        with recorder.record("import_from_gmsh"):
+            import_from_gmsh()
+
+    with recorder.record("export_to_su2"):
+        export_to_su2(mesh, os.path.join(output_dir, "mesh.su2"))
+
+    with recorder.record("Mesh.get_marker_point"):
+        for proportion in MARKER_POINT_PROPORTIONS:
+            mesh.get_marker_point(workload.marker_name, proportion)
+
+    visualize_mesh = get_visualize_mesh()
+    if visualize_mesh is not None:
+        with recorder.record("visualize_mesh"), contextlib.redirect_stdout(io.StringIO()):
+            visualize_mesh(mesh)
+
+    return len(mesh.elements)
+
+
+def run_workload(workload: Workload, size: int, num_repeats: int, num_warmups: int):
+    "get the number of elements and the best time and peak memory of each stage of a workload"
+    best_times: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        # first runs include lazy imports and caches that later runs don't pay for
+        for _ in range(num_warmups):
+            run_pipeline(workload, size, StageRecorder(is_tracing=False), output_dir)
+
+        for _ in range(num_repeats):
+            recorder = StageRecorder(is_tracing=False)
+            num_elements = run_pipeline(workload, size, recorder, output_dir)
+            for stage, stage_time in recorder.times.items():
+                best_times[stage] = min(stage_time, best_times.get(stage, np.inf))
+
+        recorder = StageRecorder(is_tracing=True)
+        tracemalloc.start()
+        try:
+            run_pipeline(workload, size, recorder, output_dir)
+        finally:
+            tracemalloc.stop()
+
+    stages = {
+        stage: {"time": best_times[stage], "peak_memory": recorder.peak_memories[stage]}
+        for stage in STAGES if stage in best_times
+    }
+    return {"num_elements": num_elements, "stages": stages}
+
+
+def get_environment():
+    "get the environment results were recorded in, since baselines only compare within one"
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "gmsh": getattr(gmsh, "__version__", "unknown"),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare_results(
+    results: Dict,
+    baseline: Dict,
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_time_difference: float,
+    min_memory_difference: int,
+):
+    "get regressions of results against a baseline as (benchmark, stage, metric, baseline, current) tuples"
+    regressions = []
+    for benchmark, result in results["benchmarks"].items():
+        if benchmark not in baseline["benchmarks"]:
+            continue
+        baseline_stages = baseline["benchmarks"][benchmark]["stages"]
+        for stage, metrics in result["stages"].items():
+            if stage not in baseline_stages:
+                continue
+            baseline_time, current_time = baseline_stages[stage]["time"], metrics["time"]
+            if current_time > baseline_time*(1 + time_tolerance) and current_time - baseline_time > min_time_difference:
+                regressions.append((benchmark, stage, "time", baseline_time, current_time))
+            baseline_memory, current_memory = baseline_stages[stage]["peak_memory"], metrics["peak_memory"]
+            if current_memory > baseline_memory*(1 + memory_tolerance) and current_memory - baseline_memory > min_memory_difference:
+                regressions.append((benchmark, stage, "peak_memory", baseline_memory, current_memory))
+    return regressions
+
+
+def print_results(results: Dict, baseline: Optional[Dict]):
+    print(f"{'benchmark':<14} {'stage':<22} {'time (ms)':>10} {'baseline':>10} {'peak (KiB)':>11} {'baseline':>10}")
+    for benchmark, result in results["benchmarks"].items():
+        baseline_stages = baseline["benchmarks"].get(benchmark, {}).get("stages", {}) if baseline else {}
+        for stage, metrics in result["stages"].items():
+            baseline_metrics = baseline_stages.get(stage)
+            baseline_time = f"{baseline_metrics['time']*1e3:>10.2f}" if baseline_metrics else f"{'-':>10}"
+            baseline_memory = f"{baseline_metrics['peak_memory']/1024:>10.0f}" if baseline_metrics else f"{'-':>10}"
+            print(f"{benchmark:<14} {stage:<22} {metrics['time']*1e3:>10.2f} {baseline_time} {metrics['peak_memory']/1024:>11.0f} {baseline_memory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS), help="workloads to run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4], help="size multipliers of the workloads")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per workload, the minimum is recorded")
+    parser.add_argument("--warmups", type=int, default=1, help="untimed runs per workload before the timed runs")
+    parser.add_argument("--output", help="path to write the results to as JSON")
+    parser.add_argument("--baseline", help="path of results to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="relative time increase flagged as a regression")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="relative peak memory increase flagged as a regression")
+    parser.add_argument("--min-time-difference", type=float, default=0.002, help="seconds a stage must slow down by to be flagged")
+    parser.add_argument("--min-memory-difference", type=int, default=65536, help="bytes a stage's peak memory must grow by to be flagged")
+    args = parser.parse_args()
+
+    results: Dict = {"environment": get_environment(), "benchmarks": {}}
+    for workload_name in args.workloads:
+        for size in args.sizes:
+            results["benchmarks"][f"{workload_name}/{size}"] = run_workload(WORKLOADS[workload_name], size, args.repeats, args.warmups)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["environment"] != results["environment"]:
+            print(f"warning: baseline was recorded in a different environment {baseline['environment']}", file=sys.stderr)
+
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.time_tolerance, args.memory_tolerance, args.min_time_difference, args.min_memory_difference)
+        for benchmark, stage, metric, baseline_value, current_value in regressions:
+            print(f"REGRESSION {benchmark} {stage} {metric}: {baseline_value:.6g} -> {current_value:.6g} ({current_value/max(baseline_value, 1e-12) - 1:+.0%})")
+        if len(regressions) > 0:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
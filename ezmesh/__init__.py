@@ -1,4 +1,30 @@
-from ezmesh.geometry import Geometry, BoundaryLayerField, CurveLoop, PlaneSurface, Point, Line, TransfiniteCurveField, TransfiniteSurfaceField
+from typing import TYPE_CHECKING
+import importlib
+from ezmesh.geometry import Geometry, BoundaryLayerField, CurveLoop, PlaneSurface, ExtrudedSurface, Point, Line, TransfiniteCurveField, TransfiniteSurfaceField, ThresholdField, CurvatureField, BackgroundMeshField
 from ezmesh.mesh import Mesh, ElementType
 from ezmesh.importers import import_from_file
-from ezmesh.visualizer import visualize_mesh
+from ezmesh.exporters import export_to_su2, export_to_vtu, export_to_xdmf
+
+if TYPE_CHECKING:
+    from ezmesh.visualizer import visualize_mesh, visualize_curve_loops
+
+# attributes and submodules resolved on first access so headless use doesn't import plotly, pythreejs, IPython or scipy
+LAZY_ATTRIBUTES = {
+    "visualize_mesh": "ezmesh.visualizer",
+    "visualize_curve_loops": "ezmesh.visualizer",
+}
+LAZY_SUBMODULES = ["adaptation", "distance", "interpolation", "refinement", "service", "shared", "smoothing", "structured", "submesh", "validation", "visualizer"]
+
+
+def __getattr__(name: str):
+    if name in LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    if name in LAZY_SUBMODULES:
+        return importlib.import_module(f"ezmesh.{name}")
+    raise AttributeError(f"module 'ezmesh' has no attribute '{name}'")
+
+
+def __dir__():
+    return [*globals().keys(), *LAZY_ATTRIBUTES.keys(), *LAZY_SUBMODULES]
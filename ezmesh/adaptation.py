@@ -0,0 +1,224 @@
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Union
+import time
+import numpy as np
+import numpy.typing as npt
+from scipy.sparse import csr_matrix
+from .geometry import BackgroundMeshField, ExtrudedSurface, Geometry, MeshTransaction, PlaneSurface
+from .interpolation import get_triangles, interpolate_point_values
+from .mesh import Mesh
+
+INTERPOLATION_ERROR_CONSTANT = 2/9
+"constant of the P1 interpolation error bound in 2D"
+
+
+@dataclass
+class AdaptationIteration:
+    iteration: int
+    "iteration number, 0 for the initial mesh"
+
+    num_nodes: int
+    "number of nodes of the mesh"
+
+    num_cells: int
+    "number of cells of the mesh"
+
+    max_error: float
+    "maximum estimated interpolation error of a cell"
+
+    mean_error: float
+    "mean estimated interpolation error of the cells"
+
+    elapsed_time: float
+    "seconds to compute the metric, remesh and transfer the field"
+
+
+@dataclass
+class AdaptationResult:
+    mesh: Mesh
+    "final adapted mesh"
+
+    values: npt.NDArray[np.float64]
+    "field values per node of the final mesh"
+
+    iterations: List[AdaptationIteration] = field(default_factory=list)
+    "statistics of each iteration"
+
+
+def get_nodal_gradients(mesh: Mesh, values: npt.NDArray[np.float64]):
+    "recovers nodal gradients (num_nodes, ..., 2) of nodal values with an area weighted average of cell gradients"
+    points = mesh.points[:, :2]
+    _, triangles = get_triangles(mesh)
+    flat_values = values.reshape((len(points), -1))
+
+    d1 = points[triangles[:, 1]] - points[triangles[:, 0]]
+    d2 = points[triangles[:, 2]] - points[triangles[:, 0]]
+    double_areas = d1[:, 0]*d2[:, 1] - d2[:, 0]*d1[:, 1]
+    du1 = flat_values[triangles[:, 1]] - flat_values[triangles[:, 0]]
+    du2 = flat_values[triangles[:, 2]] - flat_values[triangles[:, 0]]
+    cell_gradients = np.stack([
+        (du1*d2[:, 1, None] - du2*d1[:, 1, None]),
+        (du2*d1[:, 0, None] - du1*d2[:, 0, None]),
+    ], axis=-1) / double_areas[:, None, None]
+
+    # node-to-cell incidence weighted by cell area to average cell gradients on nodes
+    weights = np.repeat(np.abs(double_areas), 3)
+    cell_indices = np.repeat(np.arange(len(triangles)), 3)
+    incidence = csr_matrix((weights, (triangles.ravel(), cell_indices)), shape=(len(points), len(triangles)))
+    total_weights = np.asarray(incidence.sum(axis=1)).ravel()
+    total_weights[total_weights == 0] = 1
+    nodal_gradients = (incidence @ cell_gradients.reshape((len(triangles), -1))) / total_weights[:, None]
+    return nodal_gradients.reshape((*values.shape, 2))
+
+
+def get_hessians(mesh: Mesh, values: npt.NDArray[np.float64]):
+    "recovers symmetric nodal hessians (num_nodes, 2, 2) of nodal values by recovering the gradient twice"
+    hessians = get_nodal_gradients(mesh, get_nodal_gradients(mesh, values))
+    return 0.5*(hessians + hessians.transpose((0, 2, 1)))
+
+
+def get_absolute_hessians(hessians: npt.NDArray[np.float64]):
+    "hessians with absolute eigenvalues"
+    eigenvalues, eigenvectors = np.linalg.eigh(hessians)
+    return np.einsum("nij,nj,nkj->nik", eigenvectors, np.abs(eigenvalues), eigenvectors)
+
+
+def get_metric(
+    mesh: Mesh,
+    values: npt.NDArray[np.float64],
+    error: float,
+    size_min: float,
+    size_max: float,
+):
+    """gets anisotropic nodal metric tensors (num_nodes, 3, 3) that equidistribute the interpolation error of values
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        2D mesh the values are defined on
+
+    values: NDArray
+        scalar field per mesh node (i.e. Mach number or pressure)
+
+    error: float
+        target interpolation error
+
+    size_min: float
+        minimum mesh size in any direction
+
+    size_max: float
+        maximum mesh size in any direction
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(get_hessians(mesh, np.asarray(values, dtype=np.float64)))
+    metric_eigenvalues = np.clip(INTERPOLATION_ERROR_CONSTANT*np.abs(eigenvalues)/error, 1/size_max**2, 1/size_min**2)
+    metric = np.zeros((len(mesh.points), 3, 3))
+    metric[:, :2, :2] = np.einsum("nij,nj,nkj->nik", eigenvectors, metric_eigenvalues, eigenvectors)
+    metric[:, 2, 2] = 1/size_max**2
+    return metric
+
+
+def get_interpolation_errors(mesh: Mesh, values: npt.NDArray[np.float64]):
+    "estimates the interpolation error of values per triangle from the largest edge length in the hessian norm"
+    points = mesh.points[:, :2]
+    _, triangles = get_triangles(mesh)
+    absolute_hessians = get_absolute_hessians(get_hessians(mesh, np.asarray(values, dtype=np.float64)))
+    cell_hessians = absolute_hessians[triangles].mean(axis=1)
+    edges = points[triangles[:, [1, 2, 0]]] - points[triangles]
+    edge_norms = np.einsum("nei,nij,nej->ne", edges, cell_hessians, edges)
+    return INTERPOLATION_ERROR_CONSTANT*edge_norms.max(axis=1)
+
+
+def get_adaptation_iteration(iteration: int, mesh: Mesh, values: npt.NDArray[np.float64], elapsed_time: float):
+    errors = get_interpolation_errors(mesh, values)
+    return AdaptationIteration(
+        iteration=iteration,
+        num_nodes=len(mesh.points),
+        num_cells=len(mesh.elements),
+        max_error=float(errors.max()),
+        mean_error=float(errors.mean()),
+        elapsed_time=elapsed_time,
+    )
+
+
+def get_adapted_surfaces(transactions: List[MeshTransaction]) -> List[PlaneSurface]:
+    "get the plane surfaces to remesh, extruded surfaces aren't supported since the metric is 2D"
+    for transaction in transactions:
+        if isinstance(transaction, ExtrudedSurface):
+            raise ValueError("ExtrudedSurface can't be adapted, adapt the mesh of its surface before extruding")
+    surfaces = [transaction for transaction in transactions if isinstance(transaction, PlaneSurface)]
+    if len(surfaces) == 0:
+        raise ValueError("No PlaneSurface found in transactions to adapt")
+    return surfaces
+
+
+def adapt_mesh(
+    transactions: Union[MeshTransaction, List[MeshTransaction]],
+    mesh: Mesh,
+    values: npt.NDArray[np.float64],
+    error: float,
+    size_min: float,
+    size_max: float,
+    num_iterations: int = 1,
+    solve: Optional[Callable[[Mesh], npt.NDArray[np.float64]]] = None,
+):
+    """remeshes the geometry with metrics from a previous solution
+
+    Parameters
+    ==========
+
+    transactions: MeshTransaction | List[MeshTransaction]
+        plane surfaces the mesh was generated from, an ExtrudedSurface raises a ValueError
+
+    mesh: Mesh
+        2D mesh the values are defined on
+
+    values: NDArray
+        scalar field per mesh node (i.e. Mach number or pressure)
+
+    error: float
+        target interpolation error
+
+    size_min: float
+        minimum mesh size in any direction
+
+    size_max: float
+        maximum mesh size in any direction
+
+    num_iterations: int
+        number of metric, remesh and transfer iterations
+
+    solve: Callable[[Mesh], NDArray]
+        computes the field on a new mesh, otherwise the field is interpolated from the previous mesh
+    """
+    if not isinstance(transactions, list):
+        transactions = [transactions]
+    surfaces = get_adapted_surfaces(transactions)
+    values = np.asarray(values, dtype=np.float64)
+    result = AdaptationResult(mesh, values, [get_adaptation_iteration(0, mesh, values, 0.0)])
+
+    for iteration in range(1, num_iterations+1):
+        start_time = time.perf_counter()
+        metric = get_metric(result.mesh, result.values, error, size_min, size_max)
+
+        # the field is created once, but each surface has to be meshed with the anisotropic algorithm
+        background_field = BackgroundMeshField(result.mesh, metric, is_size_from_points=False)
+        for surface in surfaces:
+            surface.fields.append(background_field)
+        try:
+            with Geometry() as geometry:
+                adapted_mesh = geometry.generate(transactions)
+        finally:
+            for surface in surfaces:
+                surface.fields.remove(background_field)
+
+        if solve is not None:
+            adapted_values = np.asarray(solve(adapted_mesh), dtype=np.float64)
+        else:
+            adapted_values = interpolate_point_values(result.mesh, result.values, adapted_mesh.points)
+
+        elapsed_time = time.perf_counter() - start_time
+        result.mesh, result.values = adapted_mesh, adapted_values
+        result.iterations.append(get_adaptation_iteration(iteration, adapted_mesh, adapted_values, elapsed_time))
+
+    return result
@@ -0,0 +1,121 @@
+from typing import List, Optional, Union
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial import cKDTree
+from .interpolation import DEFAULT_CHUNK_SIZE
+from .mesh import Mesh
+
+
+def get_wall_segments(mesh: Mesh, marker_names: Union[str, List[str]]):
+    "get the (num_segments, 3) start and end points of the line elements of the markers"
+    if not isinstance(marker_names, list):
+        marker_names = [marker_names]
+    segments = []
+    for marker_name in marker_names:
+        if marker_name not in mesh.markers:
+            raise ValueError(f"Marker '{marker_name}' not found in mesh")
+        marker_elements = mesh.markers[marker_name]
+        if any(len(marker_element) != 2 for marker_element in marker_elements):
+            raise ValueError(f"Marker '{marker_name}' has elements other than lines, wall distance supports 2D meshes")
+        if len(marker_elements) > 0:
+            segments.append(np.stack(marker_elements).astype(np.intp))
+    if len(segments) == 0:
+        raise ValueError(f"Markers {marker_names} have no elements")
+    segments = np.concatenate(segments)
+    return mesh.points[segments[:, 0]], mesh.points[segments[:, 1]]
+
+
+def get_3d_points(points: npt.NDArray[np.float64]):
+    "get points padded with zeros to 3 coordinates"
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[1] < 3:
+        return np.column_stack([points, np.zeros((len(points), 3 - points.shape[1]))])
+    return points
+
+
+def get_segment_samples(starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64]):
+    """get sample points along segments including their ends at most spacing apart, the segment index of each sample and the spacing
+
+    Every point of a segment lies between two of its samples, so long segments don't
+    loosen the search bound of get_wall_distances.
+    """
+    lengths = np.linalg.norm(ends - starts, axis=1)
+    spacing = float(np.median(lengths)) or float(lengths.max()) or 1.0
+    num_intervals = np.maximum(np.ceil(lengths / spacing).astype(np.intp), 1)
+    num_samples = num_intervals + 1
+    segment_indices = np.repeat(np.arange(len(starts)), num_samples)
+    sample_offsets = np.arange(len(segment_indices)) - np.repeat(np.cumsum(num_samples) - num_samples, num_samples)
+    fractions = sample_offsets / num_intervals[segment_indices]
+    samples = starts[segment_indices] + fractions[:, None]*(ends - starts)[segment_indices]
+    return samples, segment_indices, spacing
+
+
+def get_segment_distances(points: npt.NDArray[np.float64], starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64]):
+    "get the exact distance of points to segments, broadcasting over leading dimensions"
+    directions = ends - starts
+    squared_lengths = np.einsum("...i,...i->...", directions, directions)
+    fractions = np.einsum("...i,...i->...", points - starts, directions) / np.where(squared_lengths > 0, squared_lengths, 1.0)
+    fractions = np.clip(fractions, 0.0, 1.0)
+    return np.linalg.norm(points - starts - fractions[..., None]*directions, axis=-1)
+
+
+def get_wall_distances(
+    mesh: Mesh,
+    marker_names: Union[str, List[str]],
+    points: Optional[npt.NDArray[np.float64]] = None,
+    num_candidates: int = 8,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+):
+    """get the exact distance of points to the nearest line element of the wall markers
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh with the wall markers
+
+    marker_names: str | List[str]
+        names of the wall markers
+
+    points: NDArray
+        points to get distances of, the mesh points by default
+
+    num_candidates: int
+        number of nearest segment samples checked first, more are searched for points where they don't bound the distance
+
+    chunk_size: int
+        number of points queried at once
+
+    workers: int
+        number of threads of the tree queries, -1 for all CPUs
+    """
+    starts, ends = map(get_3d_points, get_wall_segments(mesh, marker_names))
+    samples, sample_segment_indices, spacing = get_segment_samples(starts, ends)
+    tree = cKDTree(samples)
+    points = get_3d_points(mesh.points if points is None else points)
+
+    distances = np.empty(len(points))
+    for start in range(0, len(points), chunk_size):
+        chunk_points = points[start:start+chunk_size]
+        chunk_distances = np.full(len(chunk_points), np.inf)
+        is_unresolved = np.ones(len(chunk_points), dtype=bool)
+        num_chunk_candidates = min(num_candidates, len(samples))
+        while is_unresolved.any():
+            unresolved_indices = np.flatnonzero(is_unresolved)
+            unresolved_points = chunk_points[unresolved_indices]
+            sample_distances, candidates = tree.query(unresolved_points, k=num_chunk_candidates, workers=workers)
+            sample_distances = sample_distances.reshape((len(unresolved_points), num_chunk_candidates))
+            candidate_segments = sample_segment_indices[candidates.reshape(sample_distances.shape)]
+            segment_distances = get_segment_distances(unresolved_points[:, None, :], starts[candidate_segments], ends[candidate_segments])
+            chunk_distances[unresolved_indices] = segment_distances.min(axis=1)
+
+            # other segments lie between samples at least as far as the last candidate, which
+            # bounds their distance by the depth a chord of length spacing reaches into that sphere
+            if num_chunk_candidates == len(samples):
+                break
+            lower_bounds = np.sqrt(np.maximum(sample_distances[:, -1]**2 - 0.25*spacing**2, 0.0))
+            is_unresolved[unresolved_indices] = lower_bounds < chunk_distances[unresolved_indices]
+            num_chunk_candidates = min(4*num_chunk_candidates, len(samples))
+        distances[start:start+chunk_size] = chunk_distances
+    return distances
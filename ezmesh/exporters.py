@@ -1,5 +1,12 @@
-from typing import List, Union
-from .mesh import Mesh
+from typing import Dict, List, Union
+from xml.sax.saxutils import escape, quoteattr
+import os
+import numpy as np
+from .mesh import ElementType, Mesh
+from .utils.vtk import (
+    OFFSET_WIDTH, VTK_CELL_TYPES, VTK_DATA_TYPES, VTU_BLOCK_SIZE, get_cell_type_map, get_export_arrays, get_export_cells,
+    get_mixed_topology, write_binary_array, write_vtu_array
+)
 
 
 def export_to_su2(meshes: Union[Mesh, List[Mesh]], file_path: str):
@@ -10,21 +17,271 @@ def export_to_su2(meshes: Union[Mesh, List[Mesh]], file_path: str):
         meshes = [meshes]
     zones = []
     for izone, mesh in enumerate(meshes):
-        element_types: List[Su2ElementType] = []
-        for element_type in mesh.element_types:
+        # resolve each distinct element type once instead of once per element
+        su2_element_types: Dict[ElementType, Su2ElementType] = {}
+        for element_type in set(mesh.element_types):
             try:
-                su2_element_type = Su2ElementType[element_type.name]
-                element_types.append(su2_element_type)
-            except:
+                su2_element_types[element_type] = Su2ElementType[element_type.name]
+            except KeyError:
                 print("Warning: Element type not supported: ", element_type.name)
+        element_types: List[Su2ElementType] = [
+            su2_element_types[element_type]
+            for element_type in mesh.element_types
+            if element_type in su2_element_types
+        ]
+        # unsupported elements are dropped with their types so that elements and types stay aligned
+        elements = mesh.elements
+        if len(element_types) < len(mesh.element_types):
+            elements = [
+                element
+                for element, element_type in zip(mesh.elements, mesh.element_types)
+                if element_type in su2_element_types
+            ]
         zone = Zone(
             izone=izone+1,
             ndime=mesh.dim,
-            elements=mesh.elements,
+            elements=elements,
             element_types=element_types,
             points=mesh.points,
             markers=mesh.markers,
         )
         zones.append(zone)
     su2_mesh = Su2Mesh(len(zones), zones)
-    return export_mesh(su2_mesh, file_path)
\ No newline at end of file
+    return export_mesh(su2_mesh, file_path)
+
+SU2_BINARY_MAGIC_NUMBER = 535532
+"hex representation of SU2 that starts binary restart files"
+
+SU2_STRING_SIZE = 33
+"size of field names in binary restart files"
+
+COORDINATE_NAMES = ["x", "y", "z"]
+
+
+def get_component_names(name: str, num_components: int):
+    "get the restart field names of the components of multi-component point or cell data"
+    suffixes = COORDINATE_NAMES[:num_components] if num_components <= 3 else [str(i) for i in range(num_components)]
+    return [f"{name}_{suffix}" for suffix in suffixes]
+
+
+def get_restart_fields(mesh: Mesh, is_cell_data: bool = False):
+    "get restart field names and arrays with coordinates first and multi-component data split per component, of points or of cell centroids if is_cell_data"
+    coords = mesh.get_cell_centroids() if is_cell_data else mesh.points
+    data = mesh.cell_data if is_cell_data else mesh.point_data
+    field_names: List[str] = []
+    field_arrays: List[np.ndarray] = []
+    for i in range(mesh.dim):
+        field_names.append(COORDINATE_NAMES[i])
+        field_arrays.append(coords[:, i])
+    for name, values in data.items():
+        values = np.asarray(values)
+        assert len(values) == len(coords), f"{'cell' if is_cell_data else 'point'} data '{name}' must be defined for each {'element' if is_cell_data else 'point'}"
+        component_values = values.reshape((len(values), -1)).T
+        if len(component_values) == 1:
+            field_names.append(name)
+            field_arrays.append(component_values[0])
+        else:
+            field_names += get_component_names(name, len(component_values))
+            field_arrays += list(component_values)
+    return field_names, field_arrays
+
+
+def export_to_su2_restart(mesh: Mesh, file_path: str, chunk_size: int = 100_000, is_cell_data: bool = False):
+    """Export mesh coordinates and point data to a SU2 restart file, ASCII for .csv and binary otherwise
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to export
+
+    file_path: str
+        path of the restart file
+
+    chunk_size: int
+        rows written at a time
+
+    is_cell_data: bool
+        if true, a cell-centered restart of the cell data is written with one row per element at its centroid instead
+
+    A restart file holds either point or cell data, so a mesh with both is exported to two files.
+    """
+    field_names, field_arrays = get_restart_fields(mesh, is_cell_data)
+    num_rows = len(mesh.elements) if is_cell_data else len(mesh.points)
+    if file_path.endswith(".csv"):
+        with open(file_path, "w") as file:
+            file.write(",".join(f'"{name}"' for name in ["CellID" if is_cell_data else "PointID", *field_names]) + "\n")
+            for start in range(0, num_rows, chunk_size):
+                end = min(start+chunk_size, num_rows)
+                row_ids = np.arange(start, end)
+                chunk = np.column_stack([row_ids, *[field_array[start:end] for field_array in field_arrays]])
+                np.savetxt(file, chunk, delimiter=",", fmt=["%d", *["%.16e"]*len(field_arrays)])
+    else:
+        with open(file_path, "wb") as file:
+            np.array([SU2_BINARY_MAGIC_NUMBER, len(field_names), num_rows, 0, 0], dtype=np.int32).tofile(file)
+            np.array([name.encode()[:SU2_STRING_SIZE-1] for name in field_names], dtype=f"S{SU2_STRING_SIZE}").tofile(file)
+            for start in range(0, num_rows, chunk_size):
+                end = min(start+chunk_size, num_rows)
+                np.column_stack([field_array[start:end] for field_array in field_arrays]).astype(np.float64).tofile(file)
+
+
+def export_to_vtu(mesh: Mesh, file_path: str, is_compressed: bool = False, is_base64: bool = False, block_size: int = VTU_BLOCK_SIZE):
+    """Export a mesh with its point data, cell data and markers to a VTU file with appended binary arrays
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to export
+
+    file_path: str
+        path of the .vtu file
+
+    is_compressed: bool
+        compresses arrays with zlib
+
+    is_base64: bool
+        base64 encodes the appended arrays instead of writing them raw
+
+    block_size: int
+        bytes per compressed block and per write
+
+    Marker elements are written as cells after the mesh elements with their marker id in
+    the "marker" cell data, and the id of each marker name in the field data.
+    """
+    cells = get_export_cells(mesh)
+    points = mesh.points if mesh.points.shape[1] == 3 else np.column_stack([mesh.points, np.zeros((len(mesh.points), 3 - mesh.points.shape[1]))])
+    cell_types = get_cell_type_map(VTK_CELL_TYPES)[cells.element_types].astype(np.uint8)
+
+    header = bytearray()
+    arrays: List[np.ndarray] = []
+    offset_positions: List[int] = []
+
+    def add_line(line: str):
+        header.extend(f"{line}\n".encode())
+
+    def add_array(name: str, array: np.ndarray, indent: str):
+        num_components = 1 if array.ndim == 1 else array.shape[1]
+        line_start = f'{indent}<DataArray type="{VTK_DATA_TYPES[array.dtype]}" Name={quoteattr(name)} NumberOfComponents="{num_components}" format="appended" offset="'
+        offset_positions.append(len(header) + len(line_start.encode()))
+        add_line(f'{line_start}{"0"*OFFSET_WIDTH}"/>')
+        arrays.append(array)
+
+    compressor = ' compressor="vtkZLibDataCompressor"' if is_compressed else ""
+    add_line('<?xml version="1.0"?>')
+    add_line(f'<VTKFile type="UnstructuredGrid" version="0.1" byte_order="LittleEndian" header_type="UInt64"{compressor}>')
+    add_line("  <UnstructuredGrid>")
+    if len(cells.marker_ids) > 0:
+        add_line("    <FieldData>")
+        for marker_name, marker_id in cells.marker_ids.items():
+            add_line(f'      <DataArray type="Int32" Name={quoteattr(marker_name)} NumberOfTuples="1" format="ascii">{marker_id}</DataArray>')
+        add_line("    </FieldData>")
+    add_line(f'    <Piece NumberOfPoints="{len(points)}" NumberOfCells="{len(cell_types)}">')
+    add_line("      <PointData>")
+    for name, values in get_export_arrays(mesh.point_data).items():
+        assert len(values) == len(points), f"point data '{name}' must be defined for each point"
+        add_array(name, values, "        ")
+    add_line("      </PointData>")
+    add_line("      <CellData>")
+    for name, values in cells.cell_data.items():
+        add_array(name, values, "        ")
+    add_line("      </CellData>")
+    add_line("      <Points>")
+    add_array("Points", np.ascontiguousarray(points, dtype=np.float64), "        ")
+    add_line("      </Points>")
+    add_line("      <Cells>")
+    add_array("connectivity", cells.connectivity, "        ")
+    add_array("offsets", cells.offsets, "        ")
+    add_array("types", cell_types, "        ")
+    add_line("      </Cells>")
+    add_line("    </Piece>")
+    add_line("  </UnstructuredGrid>")
+    add_line(f'  <AppendedData encoding="{"base64" if is_base64 else "raw"}">')
+
+    with open(file_path, "wb") as file:
+        file.write(header)
+        file.write(b"   _")
+        data_start = file.tell()
+        array_offsets = []
+        for array in arrays:
+            array_offsets.append(file.tell() - data_start)
+            write_vtu_array(file, array, is_compressed, is_base64, block_size)
+        file.write(b"\n  </AppendedData>\n</VTKFile>\n")
+
+        # offsets of the appended arrays are only known once they are written
+        for offset_position, array_offset in zip(offset_positions, array_offsets):
+            file.seek(offset_position)
+            file.write(f"{array_offset:0{OFFSET_WIDTH}d}".encode())
+
+
+def export_to_xdmf(mesh: Mesh, file_path: str, block_size: int = VTU_BLOCK_SIZE):
+    """Export a mesh with its point data, cell data and markers to an XDMF file with arrays in a raw binary file next to it
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to export
+
+    file_path: str
+        path of the .xdmf file, arrays are written to the same path with a .bin extension
+
+    block_size: int
+        bytes per write
+
+    Marker elements are written as cells after the mesh elements with their marker id in
+    the "marker" cell attribute, and the id of each marker name as grid information.
+    """
+    cells = get_export_cells(mesh)
+    points = mesh.points if mesh.points.shape[1] == 3 else np.column_stack([mesh.points, np.zeros((len(mesh.points), 3 - mesh.points.shape[1]))])
+    topology = get_mixed_topology(cells)
+    binary_path = f"{os.path.splitext(file_path)[0]}.bin"
+    binary_name = os.path.basename(binary_path)
+
+    lines: List[str] = []
+    with open(binary_path, "wb") as binary_file:
+        def add_data_item(array: np.ndarray, indent: str):
+            # XDMF names 1 byte integers chars, with a U prefix for unsigned integers
+            if array.dtype.kind == "f":
+                number_type = "Float"
+            else:
+                number_type = ("U" if array.dtype.kind == "u" else "") + ("Char" if array.dtype.itemsize == 1 else "Int")
+            dimensions = " ".join(str(dimension) for dimension in array.shape)
+            lines.append(
+                f'{indent}<DataItem NumberType="{number_type}" Precision="{array.dtype.itemsize}" Dimensions="{dimensions}" '
+                f'Format="Binary" Endian="Little" Seek="{binary_file.tell()}">{escape(binary_name)}</DataItem>'
+            )
+            write_binary_array(binary_file, array, block_size)
+
+        def add_attribute(name: str, array: np.ndarray, center: str):
+            # 2D vectors are padded since readers only take vectors of 3 components
+            if array.ndim == 2 and array.shape[1] == 2:
+                array = np.column_stack([array, np.zeros(len(array), dtype=array.dtype)])
+            attribute_type = "Scalar" if array.ndim == 1 else ("Vector" if array.shape[1] == 3 else "Matrix")
+            lines.append(f'      <Attribute Name={quoteattr(name)} AttributeType="{attribute_type}" Center="{center}">')
+            add_data_item(array, "        ")
+            lines.append("      </Attribute>")
+
+        lines.append('<?xml version="1.0"?>')
+        lines.append('<Xdmf Version="3.0">')
+        lines.append("  <Domain>")
+        lines.append('    <Grid Name="mesh" GridType="Uniform">')
+        for marker_name, marker_id in cells.marker_ids.items():
+            lines.append(f'      <Information Name={quoteattr(marker_name)} Value="{marker_id}"/>')
+        lines.append('      <Geometry GeometryType="XYZ">')
+        add_data_item(np.ascontiguousarray(points, dtype=np.float64), "        ")
+        lines.append("      </Geometry>")
+        lines.append(f'      <Topology TopologyType="Mixed" NumberOfElements="{len(cells.offsets)}">')
+        add_data_item(topology, "        ")
+        lines.append("      </Topology>")
+        for name, values in get_export_arrays(mesh.point_data).items():
+            assert len(values) == len(points), f"point data '{name}' must be defined for each point"
+            add_attribute(name, values, "Node")
+        for name, values in cells.cell_data.items():
+            add_attribute(name, values, "Cell")
+        lines.append("    </Grid>")
+        lines.append("  </Domain>")
+        lines.append("</Xdmf>")
+
+    with open(file_path, "w") as file:
+        file.write("\n".join(lines) + "\n")
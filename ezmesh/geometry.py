@@ -1,14 +1,17 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Union, cast
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Set, Tuple, Union, cast
 import numpy as np
 import numpy.typing as npt
 import gmsh
-from ezmesh.exporters import export_to_su2
-from ezmesh.utils.geometry import PropertyType, get_bspline, get_property, get_group_name, get_sampling
-from ezmesh.visualizer import visualize_curve_loops
+from ezmesh.exporters import export_to_su2, export_to_vtu, export_to_xdmf
+from ezmesh.mesh import ElementType, Mesh
+from ezmesh.utils.geometry import PropertyType, get_bspline, get_curvature, get_property, get_group_name, get_sampling, get_view_list_data
 from .importers import import_from_gmsh
 
+if TYPE_CHECKING:
+    from .service import MeshingService, ProgressCallback
+
 Number = Union[int, float]
 SegmentType = Union["Line", "Curve"]
 PointCoordType = Union[npt.NDArray[np.float64], Tuple[Number, Number], List[Number]]
@@ -16,11 +19,53 @@ ListOrTuple = Union[List, Tuple]
 GroupType = Union[npt.NDArray[np.float64], Tuple[str, npt.NDArray[np.float64]]]
 
 
+CurveKey = Tuple[str, Tuple[int, ...]]
+
+
 class MeshContext:
     point_registry: Dict[Tuple[float, float, float], int]
+    curve_registry: Dict[CurveKey, int]
+    curve_loop_registry: Dict[FrozenSet[int], int]
+    physical_groups: Dict[Tuple[int, str], List[int]]
+    size_fields: List[int]
+    tensor_size_fields: Set[int]
+    extruded_surface_tags: Set[int]
 
     def __init__(self) -> None:
         self.point_registry = {}
+        self.curve_registry = {}
+        self.curve_loop_registry = {}
+        self.physical_groups = {}
+        self.size_fields = []
+        self.tensor_size_fields = set()
+        self.extruded_surface_tags = set()
+
+    def get_curve_tag(self, type: str, point_tags: List[int]) -> Optional[int]:
+        "get tag of a registered curve through the points, negative if registered in the opposite direction"
+        key = (type, tuple(point_tags))
+        if key in self.curve_registry:
+            return self.curve_registry[key]
+        reversed_key = (type, tuple(reversed(point_tags)))
+        if reversed_key in self.curve_registry:
+            return -self.curve_registry[reversed_key]
+        return None
+
+    def add_physical_group(self, dim: int, name: str, tags: List[int]):
+        "adds entities to a physical group, created once per name when synchronized"
+        if (dim, name) not in self.physical_groups:
+            self.physical_groups[(dim, name)] = []
+        group_tags = self.physical_groups[(dim, name)]
+        for tag in tags:
+            if abs(tag) not in group_tags:
+                group_tags.append(abs(tag))
+
+    def sync_physical_groups(self):
+        "creates registered physical groups"
+        for (dim, name), tags in self.physical_groups.items():
+            physical_group_tag = gmsh.model.add_physical_group(dim, tags)
+            if len(name) > 0:
+                gmsh.model.set_physical_name(dim, physical_group_tag, name)
+        self.physical_groups = {}
 
 
 class DimType(Enum):
@@ -124,7 +169,11 @@ class Line(MeshTransaction):
         if not self.before_sync_initiated:
             self.start.before_sync(ctx)
             self.end.before_sync(ctx)
-            self.tag = gmsh.model.geo.add_line(self.start.tag, self.end.tag)
+            point_tags = [cast(int, self.start.tag), cast(int, self.end.tag)]
+            self.tag = ctx.get_curve_tag("Line", point_tags)
+            if self.tag is None:
+                self.tag = gmsh.model.geo.add_line(*point_tags)
+                ctx.curve_registry[("Line", tuple(point_tags))] = self.tag
         super().before_sync(ctx)
 
     def reset(self):
@@ -163,14 +212,17 @@ class Curve(MeshTransaction):
                 ctrl_point.before_sync(ctx)
                 ctrl_point_tags.append(ctrl_point.tag)
 
-            if self.type == "BSpline":
-                self.tag = gmsh.model.geo.add_bspline(ctrl_point_tags)
-            elif self.type == "Spline":
-                self.tag = gmsh.model.geo.add_spline(ctrl_point_tags)
-            elif self.type == "Bezier":
-                self.tag = gmsh.model.geo.add_bezier(ctrl_point_tags)
-            else:
-                raise ValueError(f"Curve type {self.type} not specified")
+            self.tag = ctx.get_curve_tag(self.type, ctrl_point_tags)
+            if self.tag is None:
+                if self.type == "BSpline":
+                    self.tag = gmsh.model.geo.add_bspline(ctrl_point_tags)
+                elif self.type == "Spline":
+                    self.tag = gmsh.model.geo.add_spline(ctrl_point_tags)
+                elif self.type == "Bezier":
+                    self.tag = gmsh.model.geo.add_bezier(ctrl_point_tags)
+                else:
+                    raise ValueError(f"Curve type {self.type} not specified")
+                ctx.curve_registry[(self.type, tuple(ctrl_point_tags))] = self.tag
 
         super().before_sync(ctx)
 
@@ -226,6 +278,7 @@ class CurveLoop(MeshTransaction):
                 self.segment_groups[name].append(segment)
 
     def visualize(self):
+        from ezmesh.visualizer import visualize_curve_loops
         visualize_curve_loops([self], self.label or "Curve Loop")
 
     def get_exterior_coords(self, num_pnts: int, is_cosine_sampling: bool = True):
@@ -246,7 +299,14 @@ class CurveLoop(MeshTransaction):
             for segment in self.segments:
                 segment.before_sync(ctx)
                 segement_tags.append(cast(int, segment.tag))
-            self.tag = gmsh.model.geo.add_curve_loop(segement_tags)
+
+            # curve loops of shared curves are reused by surfaces on either side
+            curve_loop_key = frozenset(abs(segement_tag) for segement_tag in segement_tags)
+            if curve_loop_key in ctx.curve_loop_registry:
+                self.tag = ctx.curve_loop_registry[curve_loop_key]
+            else:
+                self.tag = gmsh.model.geo.add_curve_loop(segement_tags)
+                ctx.curve_loop_registry[curve_loop_key] = self.tag
 
             for field in self.fields:
                 field.before_sync(ctx, self)
@@ -358,6 +418,7 @@ class PlaneSurface(MeshTransaction):
         self.curve_loops = self.outlines + self.holes
 
     def visualize(self, title: str = "Surface"):
+        from ezmesh.visualizer import visualize_curve_loops
         visualize_curve_loops(self.outlines, title)
 
     def before_sync(self, ctx: MeshContext):
@@ -376,14 +437,13 @@ class PlaneSurface(MeshTransaction):
             for curve_loop in self.curve_loops:
                 curve_loop.after_sync(ctx)
                 segment_groups = {**segment_groups, **curve_loop.segment_groups}
-            for (name, segments) in segment_groups.items():
-                segment_tags = [segment.tag for segment in segments if segment.tag is not None]
-                physical_group_tag = gmsh.model.add_physical_group(DimType.CURVE.value, segment_tags)
-                gmsh.model.set_physical_name(DimType.CURVE.value, physical_group_tag, name)
 
-            physical_group_tag = gmsh.model.add_physical_group(DimType.SURFACE.value, [self.tag])
-            if self.label is not None:
-                gmsh.model.set_physical_name(DimType.SURFACE.value, physical_group_tag, self.label)
+            # extruded surfaces are boundaries of a volume which defines the physical groups instead
+            if self.tag not in ctx.extruded_surface_tags:
+                for (name, segments) in segment_groups.items():
+                    segment_tags = [segment.tag for segment in segments if segment.tag is not None]
+                    ctx.add_physical_group(DimType.CURVE.value, name, segment_tags)
+                ctx.add_physical_group(DimType.SURFACE.value, self.label or "", [cast(int, self.tag)])
 
             if self.is_quad_mesh:
                 gmsh.model.mesh.set_recombine(2, self.tag)  # type: ignore
@@ -454,7 +514,7 @@ class BoundaryLayerField(CurveField):
     def after_sync(self, ctx: MeshContext, curve_loop: CurveLoop):
         if not self.after_sync_initiated:
             self.tag = gmsh.model.mesh.field.add('BoundaryLayer')
-            segement_tags = [segement.tag for segement in curve_loop.segments]
+            segement_tags = [abs(cast(int, segement.tag)) for segement in curve_loop.segments]
             gmsh.model.mesh.field.setNumbers(self.tag, 'CurvesList', segement_tags)
             if self.aniso_max:
                 gmsh.model.mesh.field.setNumber(self.tag, "AnisoMax", self.aniso_max)
@@ -493,15 +553,335 @@ class TransfiniteCurveField(CurveField):
     def after_sync(self, ctx: MeshContext, curve_loop: CurveLoop):
         if not self.after_sync_initiated:
             for i, segment in enumerate(curve_loop.segments):
+                segment_tag = cast(int, segment.tag)
+                mesh_type = get_property(self.mesh_types, i, segment.label, "Progression")
+                coef = get_property(self.coefs, i, segment.label, 1.0)
+                # shared curves used in the opposite direction progress the other way
+                if segment_tag < 0 and mesh_type == "Progression":
+                    coef = 1/coef
                 gmsh.model.mesh.set_transfinite_curve(
-                    segment.tag,
+                    abs(segment_tag),
                     numNodes=get_property(self.node_counts, i, segment.label)+1,
-                    meshType=get_property(self.mesh_types, i, segment.label, "Progression"),
-                    coef=get_property(self.coefs, i, segment.label, 1.0)
+                    meshType=mesh_type,
+                    coef=coef
                 )
         super().after_sync(ctx, curve_loop)
 
 
+@dataclass
+class ExtrudedSurface(MeshTransaction):
+    """
+    A volume swept from a plane surface along an offset with structured layers.
+    Lateral boundaries are labeled after the segments of the surface curve loops.
+    """
+    surface: PlaneSurface
+    "plane surface to extrude"
+
+    offset: PointCoordType
+    "extrusion vector (dx, dy, dz)"
+
+    num_layers: Union[int, List[int]] = 1
+    "number of element layers, or number per sub-layer when heights are defined"
+
+    heights: Optional[List[float]] = None
+    "normalized cumulative height of each sub-layer, equally spaced if not defined"
+
+    is_recombined: bool = True
+    "if true, layers are made of prisms or hexahedra, else tetrahedra"
+
+    label: Optional[str] = None
+    "label for physical group volume"
+
+    bottom_label: Optional[str] = None
+    "label for physical group of the extruded surface"
+
+    top_label: Optional[str] = None
+    "label for physical group of the surface opposite to the extruded surface"
+
+    def __post_init__(self):
+        super().__init__()
+        self.dim_type = DimType.VOLUME
+        self.top_tag: Optional[int] = None
+        self.side_tags: List[int] = []
+
+    def get_layers(self):
+        num_layers = self.num_layers if isinstance(self.num_layers, list) else [self.num_layers]
+        if self.heights is not None:
+            assert len(self.heights) == len(num_layers), "heights must be defined for each sub-layer"
+            return num_layers, self.heights
+        if len(num_layers) == 1:
+            return num_layers, []
+        return num_layers, list(np.linspace(0, 1, len(num_layers) + 1)[1:])
+
+    def before_sync(self, ctx: MeshContext):
+        if not self.before_sync_initiated:
+            self.surface.before_sync(ctx)
+            ctx.extruded_surface_tags.add(cast(int, self.surface.tag))
+            offset = np.zeros(3)
+            offset[:len(self.offset)] = self.offset
+            num_layers, heights = self.get_layers()
+            out_dim_tags = gmsh.model.geo.extrude(
+                [(DimType.SURFACE.value, cast(int, self.surface.tag))],
+                *offset,
+                numElements=num_layers,
+                heights=heights,
+                recombine=self.is_recombined
+            )
+            # extrude returns the top surface, the volume and then one lateral surface per boundary curve
+            self.top_tag = out_dim_tags[0][1]
+            self.tag = out_dim_tags[1][1]
+            self.side_tags = [tag for _, tag in out_dim_tags[2:]]
+
+        super().before_sync(ctx)
+
+    def after_sync(self, ctx: MeshContext):
+        if not self.after_sync_initiated:
+            self.surface.after_sync(ctx)
+
+            segments = [segment for curve_loop in self.surface.curve_loops for segment in curve_loop.segments]
+            assert len(segments) == len(self.side_tags), "lateral surfaces don't match surface segments"
+            side_groups: Dict[str, List[int]] = {}
+            for segment, side_tag in zip(segments, self.side_tags):
+                if segment.label is None:
+                    continue
+                name = get_group_name(segment.label)
+                if name not in side_groups:
+                    side_groups[name] = []
+                side_groups[name].append(side_tag)
+
+            if self.bottom_label is not None:
+                side_groups[self.bottom_label] = [*side_groups.get(self.bottom_label, []), cast(int, self.surface.tag)]
+            if self.top_label is not None:
+                side_groups[self.top_label] = [*side_groups.get(self.top_label, []), cast(int, self.top_tag)]
+
+            for (name, side_tags) in side_groups.items():
+                ctx.add_physical_group(DimType.SURFACE.value, name, side_tags)
+            ctx.add_physical_group(DimType.VOLUME.value, self.label or "", [cast(int, self.tag)])
+
+        super().after_sync(ctx)
+
+    def reset(self):
+        super().reset()
+        self.top_tag = None
+        self.side_tags = []
+        self.surface.reset()
+
+
+VIEW_LIST_TYPES = {
+    ElementType.TRIANGLE: ("ST", "TT"),
+    ElementType.QUADRILATERAL: ("SQ", "TQ"),
+    ElementType.TETRAHEDRON: ("SS", "TS"),
+    ElementType.HEXAHEDRON: ("SH", "TH"),
+    ElementType.PRISM: ("SI", "TI"),
+    ElementType.PYRAMID: ("SY", "TY"),
+}
+
+
+def add_size_view(name: str, points: npt.NDArray[np.float64], element_groups: Dict[ElementType, npt.NDArray], sizes: npt.NDArray[np.float64]) -> int:
+    "adds a post-processing view of nodal sizes (scalars) or metrics (3x3 tensors) and returns its tag"
+    view_tag = gmsh.view.add(name)
+    is_tensor = sizes.ndim == 3
+    for element_type, cells in element_groups.items():
+        if element_type not in VIEW_LIST_TYPES:
+            continue
+        list_type = VIEW_LIST_TYPES[element_type][int(is_tensor)]
+        gmsh.view.addListData(view_tag, list_type, len(cells), get_view_list_data(points, cells, sizes))
+    return view_tag
+
+
+def add_size_view_field(view_tag: int) -> int:
+    "adds a field that interpolates mesh sizes from a post-processing view"
+    field_tag = gmsh.model.mesh.field.add("PostView")
+    gmsh.model.mesh.field.setNumber(field_tag, "ViewTag", view_tag)
+    return field_tag
+
+
+@dataclass
+class ThresholdField(SurfaceField):
+    """
+    Mesh size that grows from size_min to size_max with the distance to labeled segments.
+    """
+    labels: List[str]
+    "segment group labels to measure the distance from"
+
+    size_min: float
+    "mesh size within dist_min of the segments"
+
+    size_max: float
+    "mesh size beyond dist_max of the segments"
+
+    dist_min: float = 0.0
+    "distance from segments until which size_min is used"
+
+    dist_max: float = 1.0
+    "distance from segments from which size_max is used"
+
+    sampling: int = 100
+    "number of samples per segment to compute the distance"
+
+    is_sigmoid: bool = False
+    "if true, size varies with a sigmoid between dist_min and dist_max, else linearly"
+
+    def __post_init__(self):
+        super().__init__()
+
+    def after_sync(self, ctx: MeshContext, surface: PlaneSurface):
+        if not self.after_sync_initiated:
+            segment_tags = [
+                abs(cast(int, segment.tag))
+                for curve_loop in surface.curve_loops
+                for label in self.labels if label in curve_loop.segment_groups
+                for segment in curve_loop.segment_groups[label]
+            ]
+            assert len(segment_tags) > 0, f"no segments found for labels {self.labels}"
+            distance_tag = gmsh.model.mesh.field.add("Distance")
+            gmsh.model.mesh.field.setNumbers(distance_tag, "CurvesList", segment_tags)
+            gmsh.model.mesh.field.setNumber(distance_tag, "Sampling", self.sampling)
+
+            self.tag = gmsh.model.mesh.field.add("Threshold")
+            gmsh.model.mesh.field.setNumber(self.tag, "InField", distance_tag)
+            gmsh.model.mesh.field.setNumber(self.tag, "SizeMin", self.size_min)
+            gmsh.model.mesh.field.setNumber(self.tag, "SizeMax", self.size_max)
+            gmsh.model.mesh.field.setNumber(self.tag, "DistMin", self.dist_min)
+            gmsh.model.mesh.field.setNumber(self.tag, "DistMax", self.dist_max)
+            gmsh.model.mesh.field.setNumber(self.tag, "Sigmoid", int(self.is_sigmoid))
+            ctx.size_fields.append(self.tag)
+
+        # boundary sizes would otherwise be extended over the surface, hiding the growth away from the segments
+        gmsh.model.mesh.setSizeFromBoundary(2, surface.tag, 0)
+        super().after_sync(ctx, surface)
+
+
+@dataclass
+class CurvatureField(SurfaceField):
+    """
+    Mesh size that resolves the curvature of the surface curves and grows away from them.
+    """
+    size_min: float
+    "minimum mesh size"
+
+    size_max: float
+    "maximum mesh size"
+
+    elements_per_circle: int = 20
+    "number of elements to resolve a full circle of the local curvature radius"
+
+    growth: float = 0.2
+    "increase of mesh size per unit distance from the curves"
+
+    num_samples: int = 200
+    "number of samples per curve"
+
+    def __post_init__(self):
+        super().__init__()
+
+    def get_background_sizes(self, surface: PlaneSurface):
+        "get background points and sizes from the curvature of the surface curves"
+        from scipy.spatial import cKDTree
+
+        sample_coords, sample_sizes = [], []
+        for curve_loop in surface.curve_loops:
+            for segment in curve_loop.segments:
+                if not isinstance(segment, Curve):
+                    continue
+                ctrl_point_coords = np.array([ctrl_point.coord for ctrl_point in segment.ctrl_points])
+                bspline = get_bspline(ctrl_point_coords[:, :2], 3)
+                sampling = get_sampling(self.num_samples, is_cosine_sampling=True)
+                curvature = get_curvature(bspline, sampling)
+                sample_coords.append(bspline(sampling))
+                sample_sizes.append(2*np.pi/(np.maximum(curvature, 1e-12)*self.elements_per_circle))
+        if len(sample_coords) == 0:
+            return None
+        curve_coords = np.concatenate(sample_coords)
+        curve_sizes = np.clip(np.concatenate(sample_sizes), self.size_min, self.size_max)
+
+        # regular grid at size_max spacing covering the surface so that sizes grow away from curves
+        exterior_coords = np.concatenate([curve_loop.get_exterior_coords(self.num_samples)[:, :2] for curve_loop in surface.outlines])
+        min_coord, max_coord = exterior_coords.min(axis=0) - self.size_max, exterior_coords.max(axis=0) + self.size_max
+        grid_x, grid_y = np.meshgrid(
+            np.arange(min_coord[0], max_coord[0] + self.size_max, self.size_max),
+            np.arange(min_coord[1], max_coord[1] + self.size_max, self.size_max),
+        )
+        background_coords = np.concatenate([curve_coords, np.column_stack([grid_x.ravel(), grid_y.ravel()])])
+
+        num_neighbors = min(16, len(curve_coords))
+        distances, indices = cKDTree(curve_coords).query(background_coords, k=num_neighbors)
+        distances, indices = distances.reshape((len(background_coords), -1)), indices.reshape((len(background_coords), -1))
+        background_sizes = np.minimum((curve_sizes[indices] + self.growth*distances).min(axis=1), self.size_max)
+        return background_coords, background_sizes
+
+    def after_sync(self, ctx: MeshContext, surface: PlaneSurface):
+        if not self.after_sync_initiated:
+            background = self.get_background_sizes(surface)
+            if background is not None:
+                from scipy.spatial import Delaunay
+                background_coords, background_sizes = background
+                triangles = Delaunay(background_coords).simplices
+                view_tag = add_size_view("Curvature", background_coords, {ElementType.TRIANGLE: triangles}, background_sizes)
+                self.tag = add_size_view_field(view_tag)
+                ctx.size_fields.append(self.tag)
+
+        # boundary sizes would otherwise be extended over the surface, hiding the growth away from the curves
+        gmsh.model.mesh.setSizeFromBoundary(2, surface.tag, 0)
+        super().after_sync(ctx, surface)
+
+
+@dataclass
+class BackgroundMeshField(SurfaceField):
+    """
+    Mesh size interpolated from sizes defined on the nodes of an existing mesh (i.e. from a previous solution).
+
+    The same field can be added to several surfaces. Metric tensors mesh those surfaces with the
+    BAMG algorithm and must be the only size field of the geometry, since combining fields only
+    keeps the smallest scalar size.
+    """
+    mesh: Mesh
+    "background mesh the sizes are defined on"
+
+    sizes: npt.NDArray[np.float64]
+    "mesh size per background mesh node, or (num_nodes, 3, 3) metric tensors for anisotropic meshing"
+
+    is_size_from_points: bool = True
+    "if false, point and boundary mesh sizes are ignored so the background mesh can coarsen the mesh"
+
+    def __post_init__(self):
+        super().__init__()
+        self.sizes = np.asarray(self.sizes, dtype=np.float64)
+        assert len(self.sizes) == len(self.mesh.points), "sizes must be defined for each background mesh node"
+        self.previous_options: Dict[str, float] = {}
+
+    def after_sync(self, ctx: MeshContext, surface: PlaneSurface):
+        if not self.after_sync_initiated:
+            element_groups = {element_type: cells for element_type, (_, cells) in self.mesh.get_element_groups().items()}
+            view_tag = add_size_view("Background Mesh", self.mesh.points, element_groups, self.sizes)
+            self.tag = add_size_view_field(view_tag)
+            ctx.size_fields.append(self.tag)
+            if self.sizes.ndim == 3:
+                ctx.tensor_size_fields.add(self.tag)
+
+            if not self.is_size_from_points:
+                # point sizes have no per surface setting, so they are restored on reset
+                for name in ["Mesh.MeshSizeFromPoints", "Mesh.MeshSizeFromCurvature"]:
+                    self.previous_options[name] = gmsh.option.get_number(name)
+                    gmsh.option.set_number(name, 0)
+
+        # the field is created once, the remaining settings apply to each surface it is added to
+        if not self.is_size_from_points:
+            gmsh.model.mesh.setSizeFromBoundary(2, surface.tag, 0)
+
+        # anisotropic metrics are only supported by the BAMG algorithm
+        if self.sizes.ndim == 3:
+            gmsh.model.mesh.setAlgorithm(2, surface.tag, 7)
+
+        super().after_sync(ctx, surface)
+
+    def reset(self):
+        super().reset()
+        for name, value in self.previous_options.items():
+            gmsh.option.set_number(name, value)
+        self.previous_options = {}
+
+
 class Geometry:
     def __enter__(self):
         self.ctx = MeshContext()
@@ -511,7 +891,22 @@ class Geometry:
     def __exit__(self, exc_type, exc_val, exc_tb):
         gmsh.finalize()
 
-    def generate(self, transactions: Union[MeshTransaction, List[MeshTransaction]]):
+    def generate(self, transactions: Union[MeshTransaction, List[MeshTransaction]], is_validated: bool = False):
+        """generates a mesh of the transactions
+
+        Parameters
+        ==========
+
+        transactions: MeshTransaction | List[MeshTransaction]
+            transactions to generate
+
+        is_validated: bool
+            if true, curve loops are checked for intersections and misplaced holes before meshing, raising a GeometryValidationError
+        """
+        if is_validated:
+            from .validation import validate_transactions
+            validate_transactions(transactions)
+
         if isinstance(transactions, list):
             for transaction in transactions:
                 transaction.before_sync(self.ctx)
@@ -523,6 +918,23 @@ class Geometry:
                 transaction.after_sync(self.ctx)
         else:
             transactions.after_sync(self.ctx)
+        self.ctx.sync_physical_groups()
+
+        # size fields are combined so the smallest size of all fields is used, which only works for scalar sizes
+        if len(self.ctx.tensor_size_fields) > 0 and len(self.ctx.size_fields) > 1:
+            self.ctx.size_fields, self.ctx.tensor_size_fields = [], set()
+            for transaction in (transactions if isinstance(transactions, list) else [transactions]):
+                transaction.reset()
+            raise ValueError("a BackgroundMeshField with metric tensors can't be combined with other size fields")
+        if len(self.ctx.size_fields) == 1:
+            gmsh.model.mesh.field.setAsBackgroundMesh(self.ctx.size_fields[0])
+        elif len(self.ctx.size_fields) > 1:
+            background_field_tag = gmsh.model.mesh.field.add("Min")
+            gmsh.model.mesh.field.setNumbers(background_field_tag, "FieldsList", self.ctx.size_fields)
+            gmsh.model.mesh.field.setAsBackgroundMesh(background_field_tag)
+        self.ctx.size_fields = []
+        self.ctx.tensor_size_fields = set()
+
         gmsh.option.set_number("General.ExpertMode", 1)
         gmsh.model.mesh.generate()
         self.mesh = import_from_gmsh()
@@ -535,8 +947,51 @@ class Geometry:
 
         return self.mesh
 
+    async def generate_async(
+        self,
+        transactions: Union[MeshTransaction, List[MeshTransaction]],
+        timeout: Optional[float] = None,
+        on_progress: Optional["ProgressCallback"] = None,
+        service: Optional["MeshingService"] = None,
+        is_validated: bool = False,
+    ):
+        """generates a mesh in a worker process without blocking the event loop
+
+        Parameters
+        ==========
+
+        transactions: MeshTransaction | List[MeshTransaction]
+            transactions to generate
+
+        timeout: float
+            seconds after which meshing is cancelled with asyncio.TimeoutError
+
+        on_progress: Callable[[MeshingProgress], None]
+            function or coroutine function called with each progress event
+
+        service: MeshingService
+            service to run the job in, the default service has one worker per CPU
+
+        is_validated: bool
+            if true, curve loops are checked before the job is queued, raising a GeometryValidationError
+
+        gmsh isn't used in this process, so the geometry doesn't need to be entered.
+        """
+        if is_validated:
+            from .validation import validate_transactions
+            validate_transactions(transactions)
+
+        from .service import get_default_service
+        service = service or get_default_service()
+        self.mesh = await service.generate(transactions, timeout, on_progress)
+        return self.mesh
+
     def write(self, filename: str):
         if filename.endswith(".su2"):
             export_to_su2(self.mesh, filename)
+        elif filename.endswith(".vtu"):
+            export_to_vtu(self.mesh, filename)
+        elif filename.endswith(".xdmf"):
+            export_to_xdmf(self.mesh, filename)
         else:
             gmsh.write(filename)
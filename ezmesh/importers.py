@@ -1,10 +1,14 @@
 
 from .mesh import ElementType, Mesh
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import itertools
 import numpy.typing as npt
 import numpy as np
 import gmsh
 
+if TYPE_CHECKING:
+    from .utils.msh import MshData
+
 def import_from_su2(file_path: str):
     """Import a mesh from SU2 format"""
     from su2fmt import parse_mesh
@@ -28,14 +32,118 @@ def import_from_su2(file_path: str):
     return meshes
 
 def import_from_msh(file_path: str):
-    """Import a mesh from Gmsh format"""
-    import gmsh
+    """Import a mesh from Gmsh format, parsed natively for version 4.1 and with gmsh otherwise"""
+    from .utils.msh import read_msh
+    msh_data = read_msh(file_path)
+    if msh_data.version == "4.1":
+        return import_from_msh_data(msh_data)
+
     gmsh.initialize()
     gmsh.open(file_path)
     mesh = import_from_gmsh()
     gmsh.finalize()
     return mesh
 
+def import_from_msh_data(msh_data: "MshData") -> Mesh:
+    """Import a mesh from parsed MSH 4.1 data without initializing gmsh"""
+    node_order = np.argsort(msh_data.node_tags)
+    sorted_node_tags = msh_data.node_tags[node_order]
+    points = msh_data.points[node_order]
+    is_contiguous = len(sorted_node_tags) == 0 or (sorted_node_tags[0] == 1 and sorted_node_tags[-1] == len(sorted_node_tags))
+
+    def get_node_indices(node_tags: npt.NDArray[np.uint64]):
+        if is_contiguous:
+            return (node_tags - 1).astype(np.uint32)
+        return np.searchsorted(sorted_node_tags, node_tags).astype(np.uint32)
+
+    dim = max([block.dim for block in msh_data.element_blocks if block.element_type != ElementType.POINT.value], default=0)
+    elements: List[npt.NDArray[np.uint32]] = []
+    element_types: List[ElementType] = []
+    markers: Dict[str, List[npt.NDArray[np.uint32]]] = {}
+    for block in msh_data.element_blocks:
+        if block.dim == dim:
+            group_elements = get_node_indices(block.node_tags)
+            # Mesh keeps one array per element, which are views of the block array rather than copies
+            elements += list(group_elements)
+            element_types += [ElementType(block.element_type)] * len(group_elements)
+        elif block.dim == dim - 1 and block.element_type != ElementType.POINT.value:
+            for physical_tag in msh_data.entity_physical_tags.get((block.dim, block.entity_tag), []):
+                marker_name = msh_data.physical_names.get((block.dim, physical_tag), "")
+                if len(marker_name) == 0:
+                    continue
+                if marker_name not in markers:
+                    markers[marker_name] = []
+                markers[marker_name] += list(get_node_indices(block.node_tags))
+
+    return Mesh(
+        dim,
+        elements,
+        element_types,
+        points,
+        markers,
+    )
+
+def get_grouped_fields(field_names: List[str], data: npt.NDArray[np.float64]) -> Dict[str, npt.NDArray[np.float64]]:
+    "get restart fields with the name_x, name_y, name_z or name_0 ... name_n columns of the exporter regrouped into (num_rows, n) arrays"
+    from .exporters import get_component_names
+    fields: Dict[str, npt.NDArray[np.float64]] = {}
+    i = 0
+    while i < len(field_names):
+        name, _, suffix = field_names[i].rpartition("_")
+        if name and suffix in ("x", "0"):
+            # longest run of following columns with the suffixes the exporter writes for this name
+            for num_components in range(len(field_names) - i, 1, -1):
+                if field_names[i:i+num_components] == get_component_names(name, num_components):
+                    fields[name] = data[:, i:i+num_components]
+                    i += num_components
+                    break
+            else:
+                fields[field_names[i]] = data[:, i]
+                i += 1
+        else:
+            fields[field_names[i]] = data[:, i]
+            i += 1
+    return fields
+
+
+def import_from_su2_restart(file_path: str, mesh: Optional[Mesh] = None, chunk_size: int = 100_000, is_cell_data: bool = False) -> Dict[str, npt.NDArray[np.float64]]:
+    """Import fields from a SU2 restart file, ASCII for .csv and binary otherwise
+
+    Multi-component data written by export_to_su2_restart is regrouped into (num_rows, n) arrays.
+    If a mesh is given, its point data, or its cell data if is_cell_data, is updated with the
+    fields other than the id and coordinates.
+    """
+    from .exporters import COORDINATE_NAMES, SU2_BINARY_MAGIC_NUMBER, SU2_STRING_SIZE
+    if file_path.endswith(".csv"):
+        with open(file_path, "r") as file:
+            field_names = [name.strip().strip('"') for name in file.readline().split(",")]
+            chunks = []
+            while True:
+                lines = list(itertools.islice(file, chunk_size))
+                if len(lines) == 0:
+                    break
+                chunks.append(np.loadtxt(lines, delimiter=",", ndmin=2))
+            data = np.concatenate(chunks) if len(chunks) > 0 else np.empty((0, len(field_names)))
+    else:
+        with open(file_path, "rb") as file:
+            magic_number, num_fields, num_rows, _, _ = np.fromfile(file, dtype=np.int32, count=5)
+            if magic_number != SU2_BINARY_MAGIC_NUMBER:
+                raise ValueError(f"File is not a SU2 binary restart file: {file_path}")
+            field_names = [name.decode() for name in np.fromfile(file, dtype=f"S{SU2_STRING_SIZE}", count=num_fields)]
+            data = np.fromfile(file, dtype=np.float64, count=num_fields*num_rows).reshape((num_rows, num_fields))
+
+    fields = get_grouped_fields(field_names, data)
+    if mesh is not None:
+        if is_cell_data and len(data) != len(mesh.elements):
+            raise ValueError(f"Restart file has {len(data)} cells but mesh has {len(mesh.elements)}")
+        if not is_cell_data and len(data) != len(mesh.points):
+            raise ValueError(f"Restart file has {len(data)} points but mesh has {len(mesh.points)}")
+        mesh_data = mesh.cell_data if is_cell_data else mesh.point_data
+        for name, values in fields.items():
+            if name not in ("PointID", "CellID") and name not in COORDINATE_NAMES:
+                mesh_data[name] = values
+    return fields
+
 def import_from_file(file_path: str):
     """Import a mesh from a file"""
     if file_path.endswith('.su2'):
@@ -46,25 +154,24 @@ def import_from_file(file_path: str):
 
 def import_from_gmsh() -> Mesh:
     dim = gmsh.model.getDimension()
-    elements: List[npt.NDArray[np.uint16]] = []
+    elements: List[npt.NDArray[np.uint32]] = []
     element_types: List[ElementType] = []
 
     node_tags, points_concatted, _ = gmsh.model.mesh.getNodes()
     node_indices = np.argsort(node_tags-1)  # type: ignore
     points = np.array(points_concatted, dtype=np.float64).reshape((-1, 3))[node_indices]
 
-    grouped_concatted_elements = gmsh.model.mesh.getElements()
+    grouped_concatted_elements = gmsh.model.mesh.getElements(dim)
     for element_type_value, grouped_element_tags, grouped_node_tags_concatted in zip(*grouped_concatted_elements):
-        if element_type_value == ElementType.POINT.value or element_type_value == ElementType.LINE.value:
-            continue
         num_nodes = gmsh.model.mesh.getElementProperties(element_type_value)[3]
-        group_elements = np.array(grouped_node_tags_concatted, dtype=np.uint16).reshape((-1, num_nodes)) - 1
+        group_elements = np.asarray(grouped_node_tags_concatted, dtype=np.uint32).reshape((-1, num_nodes)) - 1
+        # Mesh keeps one array per element, which are views of the block array rather than copies
         elements += list(group_elements)
-        element_types += [ElementType(element_type_value)] * len(elements)
+        element_types += [ElementType(element_type_value)] * len(group_elements)
 
-    # get physical groups
-    markers: Dict[str, List[npt.NDArray[np.uint16]]] = {}
-    physical_groups = gmsh.model.getPhysicalGroups()
+    # get physical groups of the boundary (lines for 2D, triangles and quadrilaterals for 3D)
+    markers: Dict[str, List[npt.NDArray[np.uint32]]] = {}
+    physical_groups = gmsh.model.getPhysicalGroups(dim - 1)
     for group_dim, group_tag in physical_groups:
         marker_name = gmsh.model.getPhysicalName(group_dim, group_tag)
         if len(marker_name) == 0:
@@ -72,14 +179,14 @@ def import_from_gmsh() -> Mesh:
         entities = gmsh.model.getEntitiesForPhysicalGroup(group_dim, group_tag)
         for entity in entities:
             marker_grouped_concatted_elements = gmsh.model.mesh.getElements(group_dim, tag=entity)
-            assert len(marker_grouped_concatted_elements[0]) == 1, "There should only be one group"
-            marker_element_type, marker_node_tags_concatted = marker_grouped_concatted_elements[0][0], marker_grouped_concatted_elements[2][0]
-            if marker_element_type != ElementType.LINE.value:
-                continue
-            marker_elements = np.array(marker_node_tags_concatted, dtype=np.uint16).reshape((-1, 2)) - 1
-            if marker_name not in markers:
-                markers[marker_name] = []
-            markers[marker_name] += list(marker_elements)
+            for marker_element_type, _, marker_node_tags_concatted in zip(*marker_grouped_concatted_elements):
+                if marker_element_type == ElementType.POINT.value:
+                    continue
+                num_nodes = gmsh.model.mesh.getElementProperties(marker_element_type)[3]
+                marker_elements = np.asarray(marker_node_tags_concatted, dtype=np.uint32).reshape((-1, num_nodes)) - 1
+                if marker_name not in markers:
+                    markers[marker_name] = []
+                markers[marker_name] += list(marker_elements)
 
     return Mesh(
         dim,
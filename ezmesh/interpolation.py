@@ -0,0 +1,277 @@
+from typing import Tuple
+import numpy as np
+import numpy.typing as npt
+from scipy.spatial import cKDTree
+from .mesh import ElementType, Mesh
+
+DEFAULT_CHUNK_SIZE = 100_000
+"number of points located at once to bound memory use"
+
+
+def get_triangles(mesh: Mesh) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.uint32]]:
+    "get triangle connectivity of a 2D mesh (quadrilaterals split in two) and the element index of each triangle"
+    element_indices, triangles = [], []
+    for element_type, (group_indices, cells) in mesh.get_element_groups().items():
+        if element_type == ElementType.TRIANGLE:
+            element_indices.append(group_indices)
+            triangles.append(cells)
+        elif element_type == ElementType.QUADRILATERAL:
+            element_indices += [group_indices, group_indices]
+            triangles += [cells[:, [0, 1, 2]], cells[:, [0, 2, 3]]]
+        else:
+            raise ValueError(f"Element type {element_type.name} not supported for 2D interpolation")
+    return np.concatenate(element_indices), np.concatenate(triangles)
+
+
+def get_padded_cells(mesh: Mesh):
+    "get (num_elements, 4) connectivity of a 2D mesh with triangles padded by their last node and a quadrilateral mask"
+    cells = np.empty((len(mesh.elements), 4), dtype=np.intp)
+    is_quad = np.zeros(len(mesh.elements), dtype=bool)
+    for element_type, (element_indices, connectivity) in mesh.get_element_groups().items():
+        if element_type == ElementType.TRIANGLE:
+            cells[element_indices, :3] = connectivity
+            cells[element_indices, 3] = connectivity[:, 2]
+        elif element_type == ElementType.QUADRILATERAL:
+            cells[element_indices] = connectivity
+            is_quad[element_indices] = True
+        else:
+            raise ValueError(f"Element type {element_type.name} not supported for 2D interpolation")
+    return cells, is_quad
+
+
+def get_padded_centroids(mesh_points: npt.NDArray[np.float64], cells: npt.NDArray[np.intp], is_quad: npt.NDArray[np.bool_]):
+    "get centroids of padded cells from get_padded_cells"
+    cell_points = mesh_points[cells]
+    triangle_centroids = cell_points[:, :3].mean(axis=1)
+    return np.where(is_quad[:, None], cell_points.mean(axis=1), triangle_centroids)
+
+
+def get_barycentric_coords(triangle_points: npt.NDArray[np.float64], points: npt.NDArray[np.float64]):
+    "get barycentric coordinates of points (..., 2) in triangles (..., 3, 2)"
+    p0, p1, p2 = triangle_points[..., 0, :], triangle_points[..., 1, :], triangle_points[..., 2, :]
+    v0, v1, v2 = p1 - p0, p2 - p0, points - p0
+    denominator = v0[..., 0]*v1[..., 1] - v1[..., 0]*v0[..., 1]
+    denominator = np.where(denominator == 0, np.finfo(np.float64).tiny, denominator)
+    l1 = (v2[..., 0]*v1[..., 1] - v1[..., 0]*v2[..., 1]) / denominator
+    l2 = (v0[..., 0]*v2[..., 1] - v2[..., 0]*v0[..., 1]) / denominator
+    return np.stack([1 - l1 - l2, l1, l2], axis=-1)
+
+
+def get_bilinear_coords(quad_points: npt.NDArray[np.float64], points: npt.NDArray[np.float64], num_iterations: int = 8):
+    "get bilinear weights of points (..., 2) in quadrilaterals (..., 4, 2) by inverting the bilinear map with newton iterations"
+    p0, p1, p2, p3 = (quad_points[..., i, :] for i in range(4))
+    s = np.full(points.shape[:-1], 0.5)
+    t = np.full(points.shape[:-1], 0.5)
+    for _ in range(num_iterations):
+        s_, t_ = s[..., None], t[..., None]
+        residual = (1-s_)*(1-t_)*p0 + s_*(1-t_)*p1 + s_*t_*p2 + (1-s_)*t_*p3 - points
+        ds = (1-t_)*(p1 - p0) + t_*(p2 - p3)
+        dt = (1-s_)*(p3 - p0) + s_*(p2 - p1)
+        determinant = ds[..., 0]*dt[..., 1] - dt[..., 0]*ds[..., 1]
+        determinant = np.where(determinant == 0, np.finfo(np.float64).tiny, determinant)
+        s = s - (dt[..., 1]*residual[..., 0] - dt[..., 0]*residual[..., 1]) / determinant
+        t = t - (ds[..., 0]*residual[..., 1] - ds[..., 1]*residual[..., 0]) / determinant
+    return np.stack([(1-s)*(1-t), s*(1-t), s*t, (1-s)*t], axis=-1)
+
+
+def locate_points(
+    mesh: Mesh,
+    points: npt.NDArray[np.float64],
+    num_candidates: int = 8,
+    tolerance: float = 1e-9,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """locates points in the elements of a 2D mesh
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to locate points in
+
+    points: NDArray
+        points to locate
+
+    num_candidates: int
+        number of elements with nearest centroids to search for the element containing each point
+
+    tolerance: float
+        tolerance of the element coordinates for points on element edges
+
+    chunk_size: int
+        number of points located at once
+
+    Returns the element index of each point (-1 if not found) and the (num_points, 4) weights of the element nodes.
+    """
+    cells, is_quad = get_padded_cells(mesh)
+    return locate_points_in_cells(mesh.points, cells, is_quad, points, num_candidates, tolerance, chunk_size)
+
+
+def locate_points_in_cells(
+    mesh_points: npt.NDArray[np.float64],
+    cells: npt.NDArray[np.intp],
+    is_quad: npt.NDArray[np.bool_],
+    points: npt.NDArray[np.float64],
+    num_candidates: int = 8,
+    tolerance: float = 1e-9,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    "locates points in padded cells from get_padded_cells, see locate_points"
+    mesh_points = mesh_points[:, :2]
+    points = np.asarray(points)[:, :2]
+    num_candidates = min(num_candidates, len(cells))
+    tree = cKDTree(get_padded_centroids(mesh_points, cells, is_quad))
+
+    element_indices = np.full(len(points), -1, dtype=np.intp)
+    weights = np.zeros((len(points), 4))
+    for start in range(0, len(points), chunk_size):
+        chunk_points = points[start:start+chunk_size]
+        _, candidates = tree.query(chunk_points, k=num_candidates)
+        candidates = candidates.reshape((len(chunk_points), num_candidates))
+        candidate_points = mesh_points[cells[candidates]]
+
+        # only candidates whose bounding box contains the point need element coordinates
+        min_coords = np.minimum(np.minimum(candidate_points[:, :, 0], candidate_points[:, :, 1]), np.minimum(candidate_points[:, :, 2], candidate_points[:, :, 3]))
+        max_coords = np.maximum(np.maximum(candidate_points[:, :, 0], candidate_points[:, :, 1]), np.maximum(candidate_points[:, :, 2], candidate_points[:, :, 3]))
+        margins = tolerance*np.maximum(max_coords[..., 0] - min_coords[..., 0], max_coords[..., 1] - min_coords[..., 1])
+        is_candidate = (
+            (chunk_points[:, None, 0] >= min_coords[..., 0] - margins) & (chunk_points[:, None, 0] <= max_coords[..., 0] + margins) &
+            (chunk_points[:, None, 1] >= min_coords[..., 1] - margins) & (chunk_points[:, None, 1] <= max_coords[..., 1] + margins)
+        )
+        candidate_chunk_points = np.broadcast_to(chunk_points[:, None, :], candidates.shape + (2,))
+
+        candidate_weights = np.full((*candidates.shape, 4), -1.0)
+        is_triangle_candidate = is_candidate & ~is_quad[candidates]
+        is_quad_candidate = is_candidate & is_quad[candidates]
+        if is_triangle_candidate.any():
+            triangle_weights = np.zeros((np.count_nonzero(is_triangle_candidate), 4))
+            triangle_weights[:, :3] = get_barycentric_coords(
+                candidate_points[is_triangle_candidate][:, :3],
+                candidate_chunk_points[is_triangle_candidate]
+            )
+            candidate_weights[is_triangle_candidate] = triangle_weights
+        if is_quad_candidate.any():
+            candidate_weights[is_quad_candidate] = get_bilinear_coords(
+                candidate_points[is_quad_candidate],
+                candidate_chunk_points[is_quad_candidate]
+            )
+
+        is_inside = (candidate_weights >= -tolerance).all(axis=-1)
+        found_candidate = is_inside.argmax(axis=1)
+        chunk_indices = np.arange(len(chunk_points))
+        is_found = is_inside[chunk_indices, found_candidate]
+        element_indices[start:start+chunk_size] = np.where(is_found, candidates[chunk_indices, found_candidate], -1)
+        weights[start:start+chunk_size] = candidate_weights[chunk_indices, found_candidate]
+
+    return element_indices, weights
+
+
+def get_nearest_nodes(mesh: Mesh, points: npt.NDArray[np.float64], element_indices: npt.NDArray[np.intp]):
+    "get the nearest mesh node of each point not located in an element"
+    is_found = element_indices >= 0
+    if is_found.all():
+        return np.empty(0, dtype=np.intp)
+    _, nearest_nodes = cKDTree(mesh.points[:, :2]).query(np.asarray(points)[~is_found, :2])
+    return nearest_nodes
+
+
+def get_weighted_values(
+    values: npt.NDArray[np.float64],
+    cells: npt.NDArray[np.intp],
+    element_indices: npt.NDArray[np.intp],
+    weights: npt.NDArray[np.float64],
+    nearest_nodes: npt.NDArray[np.intp],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    "interpolates nodal values with the element weights of located points and the nearest node of the others"
+    values = np.asarray(values)
+    is_found = element_indices >= 0
+    weighted_values = np.empty((len(element_indices), *values.shape[1:]), dtype=np.float64)
+    for start in range(0, len(element_indices), chunk_size):
+        chunk = slice(start, start+chunk_size)
+        chunk_is_found = is_found[chunk]
+        chunk_values = weighted_values[chunk]
+        chunk_values[chunk_is_found] = np.einsum(
+            "nk,nk...->n...",
+            weights[chunk][chunk_is_found],
+            values[cells[element_indices[chunk][chunk_is_found]]]
+        )
+    weighted_values[~is_found] = values[nearest_nodes]
+    return weighted_values
+
+
+def interpolate_point_values(
+    mesh: Mesh,
+    values: npt.NDArray[np.float64],
+    points: npt.NDArray[np.float64],
+    num_candidates: int = 8,
+    tolerance: float = 1e-9,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """interpolates nodal values of a 2D mesh onto points
+
+    Values are interpolated barycentric in triangles and bilinear in quadrilaterals.
+    Points outside of the mesh take the value of the nearest mesh node.
+    """
+    element_indices, weights = locate_points(mesh, points, num_candidates, tolerance, chunk_size)
+    cells, _ = get_padded_cells(mesh)
+    nearest_nodes = get_nearest_nodes(mesh, points, element_indices)
+    return get_weighted_values(values, cells, element_indices, weights, nearest_nodes, chunk_size)
+
+
+def interpolate_cell_values(
+    mesh: Mesh,
+    values: npt.NDArray[np.float64],
+    points: npt.NDArray[np.float64],
+    num_candidates: int = 8,
+    tolerance: float = 1e-9,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """interpolates element values of a 2D mesh onto points from the element containing each point
+
+    Points outside of the mesh take the value of the element with the nearest centroid.
+    """
+    values = np.asarray(values)
+    element_indices, _ = locate_points(mesh, points, num_candidates, tolerance, chunk_size)
+    is_found = element_indices >= 0
+
+    interpolated_values = np.empty((len(points), *values.shape[1:]), dtype=np.float64)
+    interpolated_values[is_found] = values[element_indices[is_found]]
+    if not is_found.all():
+        _, nearest_cells = cKDTree(mesh.get_cell_centroids()[:, :2]).query(np.asarray(points)[~is_found, :2])
+        interpolated_values[~is_found] = values[nearest_cells]
+
+    return interpolated_values
+
+
+def transfer_data(
+    source: Mesh,
+    target: Mesh,
+    num_candidates: int = 8,
+    tolerance: float = 1e-9,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    "transfers point and cell data of the source mesh onto the target mesh"
+    cells, is_quad = get_padded_cells(source)
+    if len(source.point_data) > 0:
+        element_indices, weights = locate_points_in_cells(source.points, cells, is_quad, target.points, num_candidates, tolerance, chunk_size)
+        nearest_nodes = get_nearest_nodes(source, target.points, element_indices)
+        for name, values in source.point_data.items():
+            target.point_data[name] = get_weighted_values(values, cells, element_indices, weights, nearest_nodes, chunk_size)
+
+    if len(source.cell_data) > 0:
+        target_centroids = target.get_cell_centroids()
+        element_indices, _ = locate_points_in_cells(source.points, cells, is_quad, target_centroids, num_candidates, tolerance, chunk_size)
+        is_found = element_indices >= 0
+        if not is_found.all():
+            source_centroids = get_padded_centroids(source.points[:, :2], cells, is_quad)
+            _, nearest_cells = cKDTree(source_centroids).query(target_centroids[~is_found, :2])
+
+        for name, values in source.cell_data.items():
+            target_values = np.empty((len(target.elements), *values.shape[1:]), dtype=np.float64)
+            target_values[is_found] = values[element_indices[is_found]]
+            if not is_found.all():
+                target_values[~is_found] = values[nearest_cells]
+            target.cell_data[name] = target_values
+
+    return target
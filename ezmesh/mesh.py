@@ -1,10 +1,13 @@
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import numpy.typing as npt
 import numpy as np
 
+if TYPE_CHECKING:
+    from .shared import SharedMesh, SharedMeshHandle
+
 
 class ElementType(Enum):
     LINE = 1
@@ -26,12 +29,64 @@ class BoundingBox:
 @dataclass
 class Mesh:
     dim: int
-    elements: List[npt.NDArray[np.uint16]]
+    elements: List[npt.NDArray[np.uint32]]
+    "node indices of each element, imported elements are row views of one array per element block"
+
     element_types: List[ElementType]
     points: npt.NDArray[np.float64]
-    markers: Dict[str, List[npt.NDArray[np.uint16]]]
-    target_points: Dict[str, Dict[np.uint16, str]] = field(default_factory=dict)
+    markers: Dict[str, List[npt.NDArray[np.uint32]]]
+    target_points: Dict[str, Dict[np.uint32, str]] = field(default_factory=dict)
+    point_data: Dict[str, npt.NDArray[np.float64]] = field(default_factory=dict)
+    "named field arrays defined on each point"
+
+    cell_data: Dict[str, npt.NDArray[np.float64]] = field(default_factory=dict)
+    "named field arrays defined on each element"
+
+
+    def get_element_groups(self) -> Dict[ElementType, Tuple[npt.NDArray[np.intp], npt.NDArray[np.uint32]]]:
+        "groups elements by type into element indices and (num_elements, num_nodes) connectivity arrays"
+        element_type_values = np.fromiter((element_type.value for element_type in self.element_types), dtype=np.int32, count=len(self.element_types))
+        element_groups = {}
+        for element_type_value in np.unique(element_type_values):
+            element_indices = np.flatnonzero(element_type_values == element_type_value)
+            connectivity = np.stack([self.elements[i] for i in element_indices]).astype(np.uint32, copy=False)
+            element_groups[ElementType(int(element_type_value))] = (element_indices, connectivity)
+        return element_groups
+
+    def get_cell_centroids(self):
+        "get the centroid of each element"
+        centroids = np.empty((len(self.elements), self.points.shape[1]))
+        for element_indices, connectivity in self.get_element_groups().values():
+            centroids[element_indices] = self.points[connectivity].mean(axis=1)
+        return centroids
+
+    def add_wall_distance(self, marker_names: Union[str, List[str]], name: str = "wall_distance", is_cell_data: bool = False, workers: int = 1):
+        """computes the distance to the nearest wall marker element of each point, or each cell centroid if is_cell_data
+
+        The distance is stored as point_data or cell_data under name, so it is written with
+        export_to_su2_restart and not recomputed while the mesh is kept.
+        """
+        from .distance import get_wall_distances
+        if is_cell_data:
+            self.cell_data[name] = get_wall_distances(self, marker_names, self.get_cell_centroids(), workers=workers)
+            return self.cell_data[name]
+        self.point_data[name] = get_wall_distances(self, marker_names, workers=workers)
+        return self.point_data[name]
+
+    def to_shared(self, path: Optional[str] = None) -> "SharedMesh":
+        """copies the mesh into shared memory, or a memory mapped file at path
+
+        Send the picklable handle of the returned SharedMesh to other processes and attach
+        with Mesh.from_shared. The buffer name is removed when the SharedMesh is unlinked.
+        """
+        from .shared import SharedMesh
+        return SharedMesh(self, path)
 
+    @staticmethod
+    def from_shared(handle: "SharedMeshHandle") -> "Mesh":
+        "get a mesh with arrays that are views of the shared memory or memory mapped file of a handle"
+        from .shared import attach_shared_mesh
+        return attach_shared_mesh(handle)
 
     def get_bounding_box(self):
         max_point = self.points.min(axis=0)
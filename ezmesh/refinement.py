@@ -0,0 +1,318 @@
+from typing import Dict, List, Optional, Tuple, Union, cast
+import numpy as np
+import numpy.typing as npt
+from .geometry import Curve, CurveLoop
+from .mesh import ElementType, Mesh
+from .structured import get_segment_coords
+from .submesh import select_by_marker_distance
+from .utils.geometry import get_group_name
+
+CURVE_SAMPLES_PER_CTRL_POINT = 100
+"samples per control point of the parameters of boundary nodes on curves"
+
+ChildrenType = Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], ElementType]
+
+
+def get_edge_keys(first_nodes: npt.NDArray[np.intp], second_nodes: npt.NDArray[np.intp], num_nodes: int):
+    "get a key of each undirected edge"
+    return np.minimum(first_nodes, second_nodes).astype(np.int64)*num_nodes + np.maximum(first_nodes, second_nodes)
+
+
+def get_curve_segments(curve_loops: List[CurveLoop]) -> List[Curve]:
+    "get the labeled curves of curve loops and their holes"
+    curves = []
+    for curve_loop in curve_loops:
+        curves += [segment for segment in curve_loop.segments if isinstance(segment, Curve) and segment.label is not None]
+        curves += get_curve_segments(curve_loop.holes)
+    return curves
+
+
+def project_midpoints(
+    points: npt.NDArray[np.float64],
+    marker_edges: Dict[str, npt.NDArray[np.intp]],
+    midpoint_indices: Dict[str, npt.NDArray[np.intp]],
+    curve_loops: List[CurveLoop],
+):
+    "moves midpoints of marker edges onto the curves of the marker at the mean parameter of the edge nodes"
+    from scipy.spatial import cKDTree
+    for curve in get_curve_segments(curve_loops):
+        marker_name = get_group_name(cast(str, curve.label))
+        if marker_name not in marker_edges:
+            continue
+        edges, edge_midpoint_indices = marker_edges[marker_name], midpoint_indices[marker_name]
+        is_split = edge_midpoint_indices >= 0
+        edges, edge_midpoint_indices = edges[is_split], edge_midpoint_indices[is_split]
+        if len(edges) == 0:
+            continue
+
+        sampling = np.linspace(0.0, 1.0, CURVE_SAMPLES_PER_CTRL_POINT*len(curve.ctrl_points))
+        curve_coords = get_segment_coords(curve, sampling)
+        node_distances, node_samples = cKDTree(curve_coords).query(points[edges.ravel(), :2])
+        node_distances, node_parameters = node_distances.reshape((-1, 2)), sampling[node_samples].reshape((-1, 2))
+
+        # only edges with both nodes on this curve, away from the seam of closed curves
+        edge_lengths = np.linalg.norm(points[edges[:, 1], :2] - points[edges[:, 0], :2], axis=1)
+        is_on_curve = (node_distances.max(axis=1) <= 0.25*edge_lengths) & (np.abs(node_parameters[:, 1] - node_parameters[:, 0]) < 0.5)
+        if is_on_curve.any():
+            projected_coords = get_segment_coords(curve, node_parameters[is_on_curve].mean(axis=1))
+            points[edge_midpoint_indices[is_on_curve], :2] = projected_coords
+
+
+def get_closure(
+    polygons: Dict[ElementType, Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]],
+    element_edges: Dict[ElementType, npt.NDArray[np.intp]],
+    is_marked: npt.NDArray[np.bool_],
+    num_edges: int,
+):
+    """get the edges split to refine the marked elements without hanging nodes
+
+    Triangles with more than one split edge and quadrilaterals with more than one split edge,
+    except two opposite ones, are refined fully, until no more elements are.
+    """
+    is_split_edge = np.zeros(num_edges, dtype=bool)
+    for element_type, (element_indices, _) in polygons.items():
+        is_split_edge[element_edges[element_type][is_marked[element_indices]].ravel()] = True
+
+    while True:
+        num_split_edges = np.count_nonzero(is_split_edge)
+        for element_type, edges in element_edges.items():
+            is_element_split = is_split_edge[edges]
+            num_element_splits = is_element_split.sum(axis=1)
+            if element_type == ElementType.TRIANGLE:
+                is_full = num_element_splits >= 2
+            else:
+                is_opposite = (num_element_splits == 2) & (is_element_split[:, 0] == is_element_split[:, 2])
+                is_full = (num_element_splits >= 2) & ~is_opposite
+            is_split_edge[edges[is_full].ravel()] = True
+        if np.count_nonzero(is_split_edge) == num_split_edges:
+            return is_split_edge
+
+
+def get_rolled(connectivity: npt.NDArray[np.intp], shifts: npt.NDArray[np.intp]):
+    "get connectivity rows rolled so each row starts at its shift"
+    num_nodes = connectivity.shape[1]
+    return np.take_along_axis(connectivity, (shifts[:, None] + np.arange(num_nodes)) % num_nodes, axis=1)
+
+
+def get_triangle_children(
+    element_indices: npt.NDArray[np.intp],
+    connectivity: npt.NDArray[np.intp],
+    edge_midpoints: npt.NDArray[np.intp],
+) -> List[ChildrenType]:
+    "get the parent index and connectivity of red (4 triangle) and green (2 triangle) refinements of triangles"
+    is_edge_split = edge_midpoints >= 0
+    num_splits = is_edge_split.sum(axis=1)
+    children: List[ChildrenType] = []
+
+    unchanged = num_splits == 0
+    children.append((element_indices[unchanged], connectivity[unchanged], ElementType.TRIANGLE))
+
+    red = num_splits == 3
+    v0, v1, v2 = connectivity[red].T
+    m01, m12, m20 = edge_midpoints[red].T
+    red_children = np.stack([
+        np.column_stack([v0, m01, m20]),
+        np.column_stack([m01, v1, m12]),
+        np.column_stack([m20, m12, v2]),
+        np.column_stack([m01, m12, m20]),
+    ], axis=1)
+    children.append((np.repeat(element_indices[red], 4), red_children.reshape((-1, 3)), ElementType.TRIANGLE))
+
+    # green triangles are bisected from the vertex opposite of their split edge
+    green = num_splits == 1
+    split_edges = is_edge_split[green].argmax(axis=1)
+    v0, v1, v2 = get_rolled(connectivity[green], split_edges).T
+    midpoints = edge_midpoints[green][np.arange(len(split_edges)), split_edges]
+    green_children = np.stack([np.column_stack([v0, midpoints, v2]), np.column_stack([midpoints, v1, v2])], axis=1)
+    children.append((np.repeat(element_indices[green], 2), green_children.reshape((-1, 3)), ElementType.TRIANGLE))
+    return children
+
+
+def get_quad_children(
+    element_indices: npt.NDArray[np.intp],
+    connectivity: npt.NDArray[np.intp],
+    edge_midpoints: npt.NDArray[np.intp],
+    centers: npt.NDArray[np.intp],
+) -> List[ChildrenType]:
+    "get the parent index and connectivity of full (4 quad), opposite edge (2 quad) and single edge (3 triangle) refinements of quadrilaterals"
+    is_edge_split = edge_midpoints >= 0
+    num_splits = is_edge_split.sum(axis=1)
+    children: List[ChildrenType] = []
+
+    unchanged = num_splits == 0
+    children.append((element_indices[unchanged], connectivity[unchanged], ElementType.QUADRILATERAL))
+
+    full = num_splits == 4
+    v0, v1, v2, v3 = connectivity[full].T
+    m01, m12, m23, m30 = edge_midpoints[full].T
+    center = centers[full]
+    full_children = np.stack([
+        np.column_stack([v0, m01, center, m30]),
+        np.column_stack([m01, v1, m12, center]),
+        np.column_stack([center, m12, v2, m23]),
+        np.column_stack([m30, center, m23, v3]),
+    ], axis=1)
+    children.append((np.repeat(element_indices[full], 4), full_children.reshape((-1, 4)), ElementType.QUADRILATERAL))
+
+    opposite = num_splits == 2
+    split_edges = is_edge_split[opposite].argmax(axis=1)
+    v0, v1, v2, v3 = get_rolled(connectivity[opposite], split_edges).T
+    m01, _, m23, _ = get_rolled(edge_midpoints[opposite], split_edges).T
+    opposite_children = np.stack([np.column_stack([v0, m01, m23, v3]), np.column_stack([m01, v1, v2, m23])], axis=1)
+    children.append((np.repeat(element_indices[opposite], 2), opposite_children.reshape((-1, 4)), ElementType.QUADRILATERAL))
+
+    single = num_splits == 1
+    split_edges = is_edge_split[single].argmax(axis=1)
+    v0, v1, v2, v3 = get_rolled(connectivity[single], split_edges).T
+    midpoints = edge_midpoints[single][np.arange(len(split_edges)), split_edges]
+    single_children = np.stack([
+        np.column_stack([v0, midpoints, v3]),
+        np.column_stack([midpoints, v1, v2]),
+        np.column_stack([midpoints, v2, v3]),
+    ], axis=1)
+    children.append((np.repeat(element_indices[single], 3), single_children.reshape((-1, 3)), ElementType.TRIANGLE))
+    return children
+
+
+def refine_elements(mesh: Mesh, element_indices: npt.NDArray[np.intp], curve_loops: Optional[List[CurveLoop]] = None) -> Mesh:
+    """refines the selected elements of a 2D mesh into 4 elements each, with a conforming transition to the rest
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to refine
+
+    element_indices: NDArray
+        indices of the elements to refine, i.e. from a select_by_* function
+
+    curve_loops: List[CurveLoop]
+        curve loops the mesh was generated from, to project boundary midpoints onto their labeled curves
+
+    New nodes are appended after the existing nodes, so target points keep their indices.
+    Point data is interpolated linearly and cell data is copied from parent elements.
+    """
+    if mesh.dim != 2:
+        raise ValueError(f"Refinement only supports 2D meshes, got a {mesh.dim}D mesh")
+    num_nodes = len(mesh.points)
+    polygons = {
+        element_type: (group_indices, connectivity.astype(np.intp))
+        for element_type, (group_indices, connectivity) in mesh.get_element_groups().items()
+    }
+    for element_type in polygons:
+        if element_type not in (ElementType.TRIANGLE, ElementType.QUADRILATERAL):
+            raise ValueError(f"Refinement doesn't support {element_type.name} elements")
+
+    # shared edge table of all elements
+    element_edge_keys = {
+        element_type: get_edge_keys(connectivity, np.roll(connectivity, -1, axis=1), num_nodes)
+        for element_type, (_, connectivity) in polygons.items()
+    }
+    edge_keys, edge_indices = np.unique(np.concatenate([keys.ravel() for keys in element_edge_keys.values()]), return_inverse=True)
+    element_edges: Dict[ElementType, npt.NDArray[np.intp]] = {}
+    start = 0
+    for element_type, keys in element_edge_keys.items():
+        element_edges[element_type] = edge_indices[start:start+keys.size].reshape(keys.shape)
+        start += keys.size
+
+    is_marked = np.zeros(len(mesh.elements), dtype=bool)
+    is_marked[np.asarray(element_indices, dtype=np.intp)] = True
+    is_split_edge = get_closure(polygons, element_edges, is_marked, len(edge_keys))
+
+    # midpoints of split edges and centers of fully refined quadrilaterals are appended to the nodes
+    split_edge_keys = edge_keys[is_split_edge]
+    edge_midpoints = np.full(len(edge_keys), -1, dtype=np.intp)
+    edge_midpoints[is_split_edge] = num_nodes + np.arange(len(split_edge_keys))
+    split_edge_nodes = np.column_stack([split_edge_keys // num_nodes, split_edge_keys % num_nodes])
+    center_nodes = np.empty((0, 4), dtype=np.intp)
+    quad_centers = np.empty(0, dtype=np.intp)
+    if ElementType.QUADRILATERAL in polygons:
+        _, quad_connectivity = polygons[ElementType.QUADRILATERAL]
+        is_full_quad = is_split_edge[element_edges[ElementType.QUADRILATERAL]].all(axis=1)
+        quad_centers = np.full(len(quad_connectivity), -1, dtype=np.intp)
+        quad_centers[is_full_quad] = num_nodes + len(split_edge_keys) + np.arange(np.count_nonzero(is_full_quad))
+        center_nodes = quad_connectivity[is_full_quad]
+
+    def get_new_values(values: npt.NDArray):
+        return np.concatenate([values, values[split_edge_nodes].mean(axis=1), values[center_nodes].mean(axis=1)])
+
+    points = get_new_values(mesh.points)
+    point_data = {name: get_new_values(np.asarray(values)) for name, values in mesh.point_data.items()}
+
+    children: List[ChildrenType] = []
+    for element_type, (group_indices, connectivity) in polygons.items():
+        group_edge_midpoints = edge_midpoints[element_edges[element_type]]
+        if element_type == ElementType.TRIANGLE:
+            children += get_triangle_children(group_indices, connectivity, group_edge_midpoints)
+        else:
+            children += get_quad_children(group_indices, connectivity, group_edge_midpoints, quad_centers)
+
+    # children are padded to 4 nodes and kept in the order of their parents
+    parent_indices = np.concatenate([child_parent_indices for child_parent_indices, _, _ in children])
+    child_order = np.argsort(parent_indices, kind="stable")
+    padded_connectivity = np.concatenate([
+        np.pad(connectivity, ((0, 0), (0, 4 - connectivity.shape[1]))) for _, connectivity, _ in children
+    ]).astype(np.uint32)[child_order]
+    num_element_nodes = np.concatenate([np.full(len(connectivity), connectivity.shape[1]) for _, connectivity, _ in children])[child_order]
+    if (num_element_nodes == num_element_nodes[0]).all():
+        elements = list(padded_connectivity[:, :num_element_nodes[0]])
+    else:
+        elements = [element[:num_child_nodes] for element, num_child_nodes in zip(padded_connectivity, num_element_nodes.tolist())]
+    element_types = list(map({3: ElementType.TRIANGLE, 4: ElementType.QUADRILATERAL}.__getitem__, num_element_nodes.tolist()))
+    cell_data = {name: np.asarray(values)[parent_indices[child_order]] for name, values in mesh.cell_data.items()}
+
+    markers: Dict[str, List[npt.NDArray[np.uint32]]] = {}
+    marker_edges: Dict[str, npt.NDArray[np.intp]] = {}
+    marker_midpoints: Dict[str, npt.NDArray[np.intp]] = {}
+    for marker_name, marker_elements in mesh.markers.items():
+        if len(marker_elements) == 0:
+            markers[marker_name] = []
+            continue
+        edges = np.stack(marker_elements).astype(np.intp)
+        keys = get_edge_keys(edges[:, 0], edges[:, 1], num_nodes)
+        positions = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+        midpoints = np.where(edge_keys[positions] == keys, edge_midpoints[positions], -1)
+        marker_edges[marker_name], marker_midpoints[marker_name] = edges, midpoints
+
+        # split marker edges are replaced by their halves in place
+        is_split = midpoints >= 0
+        halves = np.stack([
+            np.column_stack([edges[:, 0], np.where(is_split, midpoints, edges[:, 1])]),
+            np.column_stack([midpoints, edges[:, 1]]),
+        ], axis=1)
+        is_kept = np.column_stack([np.ones(len(edges), dtype=bool), is_split])
+        markers[marker_name] = list(halves[is_kept].astype(np.uint32))
+
+    if curve_loops is not None:
+        project_midpoints(points, marker_edges, marker_midpoints, curve_loops)
+
+    return Mesh(
+        mesh.dim,
+        elements,
+        element_types,
+        points,
+        markers,
+        {marker_name: dict(marker_target_points) for marker_name, marker_target_points in mesh.target_points.items()},
+        point_data,
+        cell_data,
+    )
+
+
+def refine_uniform(mesh: Mesh, num_levels: int = 1, curve_loops: Optional[List[CurveLoop]] = None) -> Mesh:
+    "refines every element of a 2D mesh into 4 elements num_levels times, see refine_elements"
+    for _ in range(num_levels):
+        mesh = refine_elements(mesh, np.arange(len(mesh.elements)), curve_loops)
+    return mesh
+
+
+def refine_near_markers(
+    mesh: Mesh,
+    marker_names: Union[str, List[str]],
+    distance: float,
+    num_levels: int = 1,
+    curve_loops: Optional[List[CurveLoop]] = None,
+) -> Mesh:
+    "refines elements of a 2D mesh with a node within distance of the markers num_levels times, see refine_elements"
+    for _ in range(num_levels):
+        mesh = refine_elements(mesh, select_by_marker_distance(mesh, marker_names, distance), curve_loops)
+    return mesh
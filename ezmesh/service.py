@@ -0,0 +1,183 @@
+"""
+Meshing in worker processes for asyncio applications.
+
+Each job pickles its transactions, runs Geometry.generate in a separate Python process
+(gmsh state is global, so processes keep concurrent jobs isolated) and parses progress
+from the gmsh log the worker writes to stdout.
+"""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Union
+import asyncio
+import inspect
+import os
+import pickle
+import re
+import sys
+import tempfile
+import weakref
+from .mesh import Mesh
+
+PHASE_START_PATTERN = re.compile(r"Meshing (\d)D\.\.\.")
+PHASE_END_PATTERN = re.compile(r"Done meshing (\d)D")
+PERCENTAGE_PATTERN = re.compile(r"\[\s*(\d+)%\]")
+COUNTS_PATTERN = re.compile(r"(\d+) nodes (\d+) elements")
+
+DEFAULT_MAX_QUEUE_SIZE = 64
+"jobs that wait for a worker before further jobs are rejected"
+
+
+@dataclass
+class MeshingProgress:
+    phase: str
+    "current meshing phase (1D, 2D, 3D) or done"
+
+    percentage: Optional[float]
+    "percentage of the current phase if reported"
+
+    num_nodes: Optional[int]
+    "number of nodes once meshing is done"
+
+    num_elements: Optional[int]
+    "number of elements once meshing is done"
+
+    message: str
+    "gmsh log message"
+
+
+ProgressCallback = Callable[[MeshingProgress], Union[None, Awaitable[None]]]
+
+
+def parse_progress(message: str, phase: str) -> Optional[MeshingProgress]:
+    "parses a gmsh log message into a progress event, None if the message doesn't report progress"
+    phase_start_match = PHASE_START_PATTERN.search(message)
+    if phase_start_match:
+        return MeshingProgress(f"{phase_start_match.group(1)}D", 0.0, None, None, message)
+    phase_end_match = PHASE_END_PATTERN.search(message)
+    if phase_end_match:
+        return MeshingProgress(f"{phase_end_match.group(1)}D", 100.0, None, None, message)
+    counts_match = COUNTS_PATTERN.search(message)
+    if counts_match:
+        return MeshingProgress("done", 100.0, int(counts_match.group(1)), int(counts_match.group(2)), message)
+    percentage_match = PERCENTAGE_PATTERN.search(message)
+    if percentage_match:
+        return MeshingProgress(phase, float(percentage_match.group(1)), None, None, message)
+    return None
+
+
+class MeshingService:
+    """runs meshing jobs in worker processes with at most max_workers at once
+
+    Jobs beyond the running ones wait in a queue of max_queue_size, and are rejected
+    with asyncio.QueueFull when it is full. A max_queue_size of 0 queues without bound.
+    Workers are limited per event loop, so a service can be used by consecutive asyncio.run calls.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        self.semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.num_jobs = 0
+
+    def get_semaphore(self):
+        "get the worker semaphore of the running event loop, since semaphores are bound to the loop first using them"
+        loop = asyncio.get_running_loop()
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(self.max_workers)
+        return self.semaphores[loop]
+
+    async def generate(
+        self,
+        transactions: Union[Any, List[Any]],
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Mesh:
+        """generates a mesh of the transactions in a worker process
+
+        Parameters
+        ==========
+
+        transactions: MeshTransaction | List[MeshTransaction]
+            transactions to generate as in Geometry.generate
+
+        timeout: float
+            seconds the worker may run before it is killed and asyncio.TimeoutError raised, not counting time queued
+
+        on_progress: Callable[[MeshingProgress], None]
+            function or coroutine function called with each progress event
+
+        Cancelling the awaiting task kills the worker process.
+        """
+        if self.max_queue_size > 0 and self.num_jobs >= self.max_workers + self.max_queue_size:
+            raise asyncio.QueueFull(f"Meshing queue is full ({self.max_queue_size} jobs waiting)")
+        self.num_jobs += 1
+        try:
+            async with self.get_semaphore():
+                return await asyncio.wait_for(self.run_job(transactions, on_progress), timeout)
+        finally:
+            self.num_jobs -= 1
+
+    async def run_job(self, transactions: Union[Any, List[Any]], on_progress: Optional[ProgressCallback]) -> Mesh:
+        with tempfile.TemporaryDirectory(prefix="ezmesh-") as job_dir:
+            input_path, output_path = os.path.join(job_dir, "input.pkl"), os.path.join(job_dir, "output.pkl")
+            with open(input_path, "wb") as file:
+                pickle.dump(transactions, file)
+
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "ezmesh.service", input_path, output_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                _, stderr = await asyncio.gather(self.read_progress(process, on_progress), process.stderr.read())  # type: ignore
+                await process.wait()
+            except BaseException:
+                # cancellation or timeout stops the worker so it doesn't keep meshing
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+            if process.returncode != 0:
+                raise RuntimeError(f"Meshing worker failed with exit code {process.returncode}: {stderr.decode(errors='replace')[-2000:]}")
+            with open(output_path, "rb") as file:
+                return pickle.load(file)
+
+    async def read_progress(self, process: asyncio.subprocess.Process, on_progress: Optional[ProgressCallback]):
+        phase = ""
+        async for line in process.stdout:  # type: ignore
+            progress = parse_progress(line.decode(errors="replace").strip(), phase)
+            if progress is None:
+                continue
+            phase = progress.phase
+            if on_progress is not None:
+                result = on_progress(progress)
+                if inspect.isawaitable(result):
+                    await result
+
+
+default_service: Optional[MeshingService] = None
+
+
+def get_default_service() -> MeshingService:
+    "get the service used by Geometry.generate_async, with one worker per CPU"
+    global default_service
+    if default_service is None:
+        default_service = MeshingService()
+    return default_service
+
+
+def run_worker(input_path: str, output_path: str):
+    "generates the pickled transactions and pickles the mesh, logging gmsh messages to stdout"
+    import gmsh
+    from .geometry import Geometry
+    with open(input_path, "rb") as file:
+        transactions = pickle.load(file)
+    with Geometry() as geometry:
+        gmsh.option.set_number("General.Terminal", 1)
+        mesh = geometry.generate(transactions)
+    with open(output_path, "wb") as file:
+        pickle.dump(mesh, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    run_worker(sys.argv[1], sys.argv[2])
@@ -0,0 +1,278 @@
+"""
+Mesh transfer between processes through shared memory or a memory mapped file.
+
+A mesh is copied once into a single buffer, and other processes attach to it from a small
+picklable SharedMeshHandle with arrays that are views of the buffer instead of copies.
+"""
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+import os
+import sys
+import weakref
+import numpy as np
+import numpy.typing as npt
+from .mesh import ElementType, Mesh
+
+ARRAY_ALIGNMENT = 64
+"byte alignment of arrays in the buffer"
+
+ELEMENT_TYPES = {element_type.value: element_type for element_type in ElementType}
+"element type of each element type value"
+
+
+@dataclass
+class SharedArray:
+    offset: int
+    "byte offset of the array in the buffer"
+
+    dtype: str
+    "numpy dtype string of the array"
+
+    shape: Tuple[int, ...]
+    "shape of the array"
+
+
+@dataclass
+class SharedElements:
+    connectivity: SharedArray
+    "node indices of all elements, one after the other"
+
+    offsets: SharedArray
+    "(num_elements + 1) start of each element in the connectivity followed by its length"
+
+
+@dataclass
+class SharedMeshHandle:
+    name: str
+    "name of the shared memory segment, or path of the memory mapped file"
+
+    is_file: bool
+    "if true, the buffer is a memory mapped file, else a shared memory segment"
+
+    size: int
+    "size of the buffer in bytes"
+
+    dim: int
+    "dimension of the mesh"
+
+    points: SharedArray
+    "mesh points"
+
+    elements: SharedElements
+    "mesh elements"
+
+    element_types: SharedArray
+    "element type value of each element"
+
+    markers: Dict[str, SharedElements] = field(default_factory=dict)
+    "marker elements by marker name"
+
+    point_data: Dict[str, SharedArray] = field(default_factory=dict)
+    "named field arrays defined on each point"
+
+    cell_data: Dict[str, SharedArray] = field(default_factory=dict)
+    "named field arrays defined on each element"
+
+    target_points: Dict[str, Dict[int, str]] = field(default_factory=dict)
+    "target points, small enough to be pickled with the handle"
+
+
+class BufferLayout:
+    "assigns aligned offsets to arrays of a buffer"
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def add(self, dtype: npt.DTypeLike, shape: Tuple[int, ...]):
+        self.size = -(-self.size // ARRAY_ALIGNMENT)*ARRAY_ALIGNMENT
+        shared_array = SharedArray(self.size, np.dtype(dtype).str, tuple(int(length) for length in shape))
+        self.size += int(np.prod(shape, dtype=np.int64))*np.dtype(dtype).itemsize
+        return shared_array
+
+    def add_elements(self, lengths: npt.NDArray[np.int64]):
+        return SharedElements(self.add(np.uint32, (int(lengths.sum()),)), self.add(np.int64, (len(lengths) + 1,)))
+
+
+def get_array(buffer: npt.NDArray[np.uint8], shared_array: SharedArray) -> npt.NDArray:
+    "get a view of an array in the buffer"
+    dtype = np.dtype(shared_array.dtype)
+    num_bytes = int(np.prod(shared_array.shape, dtype=np.int64))*dtype.itemsize
+    return buffer[shared_array.offset:shared_array.offset+num_bytes].view(dtype).reshape(shared_array.shape)
+
+
+def get_lengths(elements: List[npt.NDArray]):
+    "get the number of nodes of each element"
+    return np.fromiter(map(len, elements), dtype=np.int64, count=len(elements))
+
+
+def write_elements(buffer: npt.NDArray[np.uint8], shared_elements: SharedElements, elements: List[npt.NDArray], lengths: npt.NDArray[np.int64]):
+    "writes elements into the buffer without an intermediate copy"
+    connectivity = get_array(buffer, shared_elements.connectivity)
+    if len(elements) > 0:
+        np.concatenate(elements, out=connectivity, casting="unsafe")
+    offsets = get_array(buffer, shared_elements.offsets)
+    offsets[0] = 0
+    np.cumsum(lengths, out=offsets[1:])
+
+
+def get_element_views(buffer: npt.NDArray[np.uint8], shared_elements: SharedElements) -> List[npt.NDArray[np.uint32]]:
+    "get each element as a view of the connectivity in the buffer"
+    connectivity = get_array(buffer, shared_elements.connectivity)
+    offsets = get_array(buffer, shared_elements.offsets)
+    num_elements = len(offsets) - 1
+    if num_elements == 0:
+        return []
+    lengths = np.diff(offsets)
+    if (lengths == lengths[0]).all():
+        return list(connectivity.reshape((num_elements, -1)))
+
+    # rows of a sliding window per element length are views, which is faster than slicing each element
+    element_views = []
+    element_indices = []
+    for length in np.unique(lengths).tolist():
+        length_indices = np.flatnonzero(lengths == length)
+        windows = np.lib.stride_tricks.as_strided(connectivity, shape=(len(connectivity) - length + 1, length), strides=(connectivity.itemsize, connectivity.itemsize))
+        element_views += map(windows.__getitem__, offsets[length_indices].tolist())
+        element_indices.append(length_indices)
+    element_order = np.argsort(np.concatenate(element_indices), kind="stable")
+    return [element_views[i] for i in element_order.tolist()]
+
+
+def open_buffer(handle: SharedMeshHandle, is_created: bool = False) -> npt.NDArray[np.uint8]:
+    """get a uint8 array of the buffer of a handle
+
+    Shared memory is unmapped once the returned array and all views of it are garbage
+    collected, since unmapping while views exist would leave them dangling.
+    """
+    if handle.is_file:
+        return np.asarray(np.memmap(handle.name, dtype=np.uint8, mode="w+" if is_created else "r+", shape=(max(handle.size, 1),)))
+
+    if is_created:
+        segment = shared_memory.SharedMemory(handle.name or None, create=True, size=max(handle.size, 1))
+        handle.name = segment.name
+    elif sys.version_info >= (3, 13):
+        segment = shared_memory.SharedMemory(handle.name, track=False)
+    else:
+        # attaching registers the segment with the resource tracker of this process, which
+        # would unlink it when this process exits even though the creator still owns it
+        segment = shared_memory.SharedMemory(handle.name)
+        resource_tracker.unregister(getattr(segment, "_name"), "shared_memory")
+    buffer = np.ndarray((max(handle.size, 1),), dtype=np.uint8, buffer=segment.buf)
+    weakref.finalize(buffer, segment.close)
+    return buffer
+
+
+def unlink_buffer(name: str, is_file: bool):
+    "removes the name of a buffer, attached processes keep their mapping until they release it"
+    if is_file:
+        if os.path.exists(name):
+            os.remove(name)
+        return
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def attach_shared_mesh(handle: SharedMeshHandle) -> Mesh:
+    """get a mesh with arrays that are views of the buffer of a handle
+
+    Element types and target points are the only copies, the elements, markers, points and
+    data arrays share memory with the creator and every other attached process.
+    """
+    return get_buffer_mesh(open_buffer(handle), handle)
+
+
+def get_buffer_mesh(buffer: npt.NDArray[np.uint8], handle: SharedMeshHandle) -> Mesh:
+    "get a mesh with arrays that are views of an open buffer"
+    element_type_values = get_array(buffer, handle.element_types).tolist()
+    return Mesh(
+        dim=handle.dim,
+        elements=get_element_views(buffer, handle.elements),
+        element_types=list(map(ELEMENT_TYPES.__getitem__, element_type_values)),
+        points=get_array(buffer, handle.points),
+        markers={marker_name: get_element_views(buffer, shared_elements) for marker_name, shared_elements in handle.markers.items()},
+        target_points={marker_name: {np.uint32(point_index): name for point_index, name in target_points.items()} for marker_name, target_points in handle.target_points.items()},
+        point_data={name: get_array(buffer, shared_array) for name, shared_array in handle.point_data.items()},
+        cell_data={name: get_array(buffer, shared_array) for name, shared_array in handle.cell_data.items()},
+    )
+
+
+class SharedMesh:
+    """a mesh copied into shared memory, or a memory mapped file if path is defined
+
+    The creator owns the buffer name. It is unlinked by unlink, when leaving a with block or
+    when the SharedMesh is garbage collected, after which no new process can attach while
+    attached processes keep their views. Keep the SharedMesh alive until receivers attached.
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to copy into the buffer
+
+    path: str
+        path of a memory mapped file to use instead of shared memory
+
+    name: str
+        name of the shared memory segment, generated if not defined
+    """
+
+    def __init__(self, mesh: Mesh, path: Optional[str] = None, name: Optional[str] = None) -> None:
+        layout = BufferLayout()
+        element_lengths = get_lengths(mesh.elements)
+        marker_lengths = {marker_name: get_lengths(elements) for marker_name, elements in mesh.markers.items()}
+        points = np.asarray(mesh.points)
+        point_data = {data_name: np.asarray(values) for data_name, values in mesh.point_data.items()}
+        cell_data = {data_name: np.asarray(values) for data_name, values in mesh.cell_data.items()}
+
+        handle = SharedMeshHandle(
+            name=path or name or "",
+            is_file=path is not None,
+            size=0,
+            dim=mesh.dim,
+            points=layout.add(points.dtype, points.shape),
+            elements=layout.add_elements(element_lengths),
+            element_types=layout.add(np.int32, (len(mesh.element_types),)),
+            markers={marker_name: layout.add_elements(lengths) for marker_name, lengths in marker_lengths.items()},
+            point_data={data_name: layout.add(values.dtype, values.shape) for data_name, values in point_data.items()},
+            cell_data={data_name: layout.add(values.dtype, values.shape) for data_name, values in cell_data.items()},
+            target_points={marker_name: {int(point_index): name for point_index, name in target_points.items()} for marker_name, target_points in mesh.target_points.items()},
+        )
+        handle.size = layout.size
+
+        buffer = open_buffer(handle, is_created=True)
+        self.buffer = buffer
+        self.handle = handle
+        self.unlinker = weakref.finalize(self, unlink_buffer, handle.name, handle.is_file)
+
+        get_array(buffer, handle.points)[:] = points
+        write_elements(buffer, handle.elements, mesh.elements, element_lengths)
+        get_array(buffer, handle.element_types)[:] = np.fromiter((element_type.value for element_type in mesh.element_types), dtype=np.int32, count=len(mesh.element_types))
+        for marker_name, elements in mesh.markers.items():
+            write_elements(buffer, handle.markers[marker_name], elements, marker_lengths[marker_name])
+        for data_name, values in point_data.items():
+            get_array(buffer, handle.point_data[data_name])[:] = values
+        for data_name, values in cell_data.items():
+            get_array(buffer, handle.cell_data[data_name])[:] = values
+        if isinstance(buffer.base, np.memmap):
+            buffer.base.flush()
+
+    def attach(self):
+        "get a mesh with arrays that are views of the buffer in this process"
+        # the created buffer is reused, attaching it again would unregister the segment from
+        # the resource tracker that unlinks it if this process crashes
+        return get_buffer_mesh(self.buffer, self.handle)
+
+    def unlink(self):
+        "removes the buffer name so no new process can attach, the memory is freed once all views are released"
+        self.unlinker()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unlink()
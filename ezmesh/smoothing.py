@@ -0,0 +1,310 @@
+from dataclasses import replace
+from typing import List, Optional, Tuple
+import numpy as np
+import numpy.typing as npt
+from scipy.sparse import csr_matrix
+from .mesh import ElementType, Mesh
+
+CornerType = Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.intp]]
+
+
+def get_polygons(mesh: Mesh) -> List[npt.NDArray[np.intp]]:
+    "get (num_elements, num_nodes) connectivity of each polygon type of a 2D mesh, oriented counter-clockwise"
+    if mesh.dim != 2:
+        raise ValueError(f"Smoothing only supports 2D meshes, got a {mesh.dim}D mesh")
+    polygons = []
+    for element_type, (_, connectivity) in mesh.get_element_groups().items():
+        if element_type not in (ElementType.TRIANGLE, ElementType.QUADRILATERAL):
+            raise ValueError(f"Smoothing doesn't support {element_type.name} elements")
+        polygons.append(connectivity.astype(np.intp))
+
+    # orient elements counter-clockwise so inverted elements are the ones with negative jacobians
+    x, y = mesh.points[:, 0], mesh.points[:, 1]
+    signed_area = sum(
+        np.sum(x[polygon]*y[np.roll(polygon, -1, axis=1)] - x[np.roll(polygon, -1, axis=1)]*y[polygon])
+        for polygon in polygons
+    )
+    if signed_area < 0:
+        return [polygon[:, ::-1] for polygon in polygons]
+    return polygons
+
+
+def get_corners(polygons: List[npt.NDArray[np.intp]]) -> CornerType:
+    "get the node, previous node and next node of each corner of the polygons"
+    return (
+        np.concatenate([polygon.ravel() for polygon in polygons]),
+        np.concatenate([np.roll(polygon, 1, axis=1).ravel() for polygon in polygons]),
+        np.concatenate([np.roll(polygon, -1, axis=1).ravel() for polygon in polygons]),
+    )
+
+
+def get_wedges(polygons: List[npt.NDArray[np.intp]]) -> CornerType:
+    """get the center, start and end node of each wedge of the polygons
+
+    Corners of a polygon are split into wedges between the rays from the corner to each
+    other node of the polygon, so quadrilaterals include their diagonals.
+    """
+    centers, starts, ends = [], [], []
+    for polygon in polygons:
+        num_nodes = polygon.shape[1]
+        for offset in range(1, num_nodes-1):
+            centers.append(polygon.ravel())
+            starts.append(np.roll(polygon, -offset, axis=1).ravel())
+            ends.append(np.roll(polygon, -offset-1, axis=1).ravel())
+    return np.concatenate(centers), np.concatenate(starts), np.concatenate(ends)
+
+
+def get_adjacency(num_nodes: int, corners: CornerType):
+    "get the symmetric (num_nodes, num_nodes) sparse adjacency of element edges"
+    nodes, _, next_nodes = corners
+    adjacency = csr_matrix(
+        (np.ones(2*len(nodes)), (np.concatenate([nodes, next_nodes]), np.concatenate([next_nodes, nodes]))),
+        shape=(num_nodes, num_nodes)
+    )
+    # interior edges are counted once per element
+    adjacency.data[:] = 1.0
+    return adjacency
+
+
+def get_fixed_nodes(mesh: Mesh, corners: CornerType, fixed_nodes: Optional[npt.NDArray[np.bool_]] = None):
+    "get a mask of nodes on marker elements, on boundary edges or in fixed_nodes that smoothing doesn't move"
+    is_fixed = np.zeros(len(mesh.points), dtype=bool) if fixed_nodes is None else fixed_nodes.copy()
+    for marker_elements in mesh.markers.values():
+        if len(marker_elements) > 0:
+            is_fixed[np.concatenate(marker_elements)] = True
+
+    # boundary edges belong to one element
+    nodes, _, next_nodes = corners
+    edge_keys = np.minimum(nodes, next_nodes).astype(np.int64)*len(mesh.points) + np.maximum(nodes, next_nodes)
+    unique_edge_keys, edge_counts = np.unique(edge_keys, return_counts=True)
+    boundary_edge_keys = unique_edge_keys[edge_counts == 1]
+    is_fixed[boundary_edge_keys // len(mesh.points)] = True
+    is_fixed[boundary_edge_keys % len(mesh.points)] = True
+    return is_fixed
+
+
+def get_corner_jacobians(coords: npt.NDArray[np.float64], corners: CornerType):
+    "get the signed double area spanned by each corner of (num_nodes, 2) coordinates, negative for inverted corners"
+    nodes, prev_nodes, next_nodes = corners
+    x, y = coords[:, 0].copy(), coords[:, 1].copy()
+    node_x, node_y = x.take(nodes), y.take(nodes)
+    return (x.take(next_nodes) - node_x)*(y.take(prev_nodes) - node_y) - (y.take(next_nodes) - node_y)*(x.take(prev_nodes) - node_x)
+
+
+def get_mean_edge_length(coords: npt.NDArray[np.float64], corners: CornerType):
+    nodes, _, next_nodes = corners
+    return float(np.linalg.norm(np.take(coords, next_nodes, axis=0) - np.take(coords, nodes, axis=0), axis=1).mean())
+
+
+def revert_inverted(
+    coords: npt.NDArray[np.float64],
+    previous_coords: npt.NDArray[np.float64],
+    corners: CornerType,
+    previous_jacobians: npt.NDArray[np.float64],
+):
+    "moves back the nodes of corners that were valid before an update and are inverted after it, returning the corner jacobians"
+    nodes, prev_nodes, next_nodes = corners
+    jacobians = get_corner_jacobians(coords, corners)
+    is_inverted = (previous_jacobians > 0) & (jacobians <= 0)
+    # reverting nodes can invert corners shared with moved nodes, so revert until none are left
+    while is_inverted.any():
+        reverted_nodes = np.concatenate([nodes[is_inverted], prev_nodes[is_inverted], next_nodes[is_inverted]])
+        coords[reverted_nodes] = previous_coords[reverted_nodes]
+        jacobians = get_corner_jacobians(coords, corners)
+        is_inverted = (previous_jacobians > 0) & (jacobians <= 0)
+    return jacobians
+
+
+def smooth_laplacian(
+    mesh: Mesh,
+    num_iterations: int = 10,
+    relaxation: float = 0.5,
+    tolerance: float = 1e-6,
+    fixed_nodes: Optional[npt.NDArray[np.bool_]] = None,
+) -> Mesh:
+    """smooths a 2D mesh by moving free nodes towards the average of their neighbors
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to smooth
+
+    num_iterations: int
+        maximum number of Jacobi iterations
+
+    relaxation: float
+        fraction of the move towards the neighbor average per iteration
+
+    tolerance: float
+        stops once no node moves more than tolerance times the mean edge length
+
+    fixed_nodes: NDArray
+        mask of additional nodes to keep in place, i.e. boundary layer nodes
+
+    Marker and boundary nodes are fixed, and moves that invert a valid element are undone.
+    """
+    corners = get_corners(get_polygons(mesh))
+    adjacency = get_adjacency(len(mesh.points), corners)
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    is_free = ~get_fixed_nodes(mesh, corners, fixed_nodes) & (degrees > 0)
+
+    coords = np.array(mesh.points[:, :2], dtype=np.float64)
+    max_displacement = tolerance*get_mean_edge_length(coords, corners)
+    jacobians = get_corner_jacobians(coords, corners)
+    for _ in range(num_iterations):
+        previous_coords = coords.copy()
+        averages = (adjacency @ coords) / np.maximum(degrees, 1)[:, None]
+        coords[is_free] += relaxation*(averages[is_free] - coords[is_free])
+        jacobians = revert_inverted(coords, previous_coords, corners, jacobians)
+        if np.abs(coords - previous_coords).max(initial=0.0) <= max_displacement:
+            break
+
+    points = mesh.points.copy()
+    points[:, :2] = coords
+    return replace(mesh, points=points)
+
+
+def smooth_angle_based(
+    mesh: Mesh,
+    num_iterations: int = 10,
+    relaxation: float = 0.5,
+    tolerance: float = 1e-6,
+    fixed_nodes: Optional[npt.NDArray[np.bool_]] = None,
+) -> Mesh:
+    """smooths a 2D mesh by rotating each free node about its neighbors to bisect the angles at them
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to smooth
+
+    num_iterations: int
+        maximum number of Jacobi iterations
+
+    relaxation: float
+        fraction of the move towards the average target position per iteration
+
+    tolerance: float
+        stops once no node moves more than tolerance times the mean edge length
+
+    fixed_nodes: NDArray
+        mask of additional nodes to keep in place, i.e. boundary layer nodes
+
+    Angle-based smoothing (Zhou and Shimada) keeps the distance of a node to its neighbors,
+    so it distorts graded and anisotropic regions less than Laplacian smoothing.
+    """
+    polygons = get_polygons(mesh)
+    corners, wedges = get_corners(polygons), get_wedges(polygons)
+    is_free = ~get_fixed_nodes(mesh, corners, fixed_nodes)
+    num_nodes = len(mesh.points)
+
+    # rays from a center node to each node sharing an element, with the wedges on each side of them
+    wedge_centers, wedge_starts, wedge_ends = wedges
+    ray_keys, ray_indices = np.unique(
+        np.concatenate([wedge_centers*num_nodes + wedge_starts, wedge_centers*num_nodes + wedge_ends]),
+        return_inverse=True
+    )
+    start_ray_indices, end_ray_indices = ray_indices[:len(wedge_centers)], ray_indices[len(wedge_centers):]
+    ray_centers, ray_ends = ray_keys // num_nodes, ray_keys % num_nodes
+    is_free_ray = is_free[ray_ends]
+    ray_centers, ray_ends = ray_centers[is_free_ray], ray_ends[is_free_ray]
+    num_targets = np.bincount(ray_ends, minlength=num_nodes)
+    is_moved = is_free & (num_targets > 0)
+
+    coords = np.array(mesh.points[:, :2], dtype=np.float64)
+    max_displacement = tolerance*get_mean_edge_length(coords, corners)
+    jacobians = get_corner_jacobians(coords, corners)
+    for _ in range(num_iterations):
+        x, y = coords[:, 0].copy(), coords[:, 1].copy()
+        center_x, center_y = x.take(wedge_centers), y.take(wedge_centers)
+        start_x, start_y = x.take(wedge_starts) - center_x, y.take(wedge_starts) - center_y
+        end_x, end_y = x.take(wedge_ends) - center_x, y.take(wedge_ends) - center_y
+        angles = np.arctan2(start_x*end_y - start_y*end_x, start_x*end_x + start_y*end_y)
+
+        # a wedge lies counter-clockwise of its start ray and clockwise of its end ray,
+        # so rotating a ray by half the difference of its wedge angles bisects them
+        rotations = 0.5*(
+            np.bincount(start_ray_indices, angles, minlength=len(ray_keys))
+            - np.bincount(end_ray_indices, angles, minlength=len(ray_keys))
+        )[is_free_ray]
+        ray_center_x, ray_center_y = x.take(ray_centers), y.take(ray_centers)
+        ray_x, ray_y = x.take(ray_ends) - ray_center_x, y.take(ray_ends) - ray_center_y
+        cos, sin = np.cos(rotations), np.sin(rotations)
+        averages = np.column_stack([
+            np.bincount(ray_ends, ray_center_x + cos*ray_x - sin*ray_y, minlength=num_nodes),
+            np.bincount(ray_ends, ray_center_y + sin*ray_x + cos*ray_y, minlength=num_nodes),
+        ]) / np.maximum(num_targets, 1)[:, None]
+
+        previous_coords = coords.copy()
+        coords[is_moved] += relaxation*(averages[is_moved] - coords[is_moved])
+        jacobians = revert_inverted(coords, previous_coords, corners, jacobians)
+        if np.abs(coords - previous_coords).max(initial=0.0) <= max_displacement:
+            break
+
+    points = mesh.points.copy()
+    points[:, :2] = coords
+    return replace(mesh, points=points)
+
+
+def untangle(
+    mesh: Mesh,
+    num_iterations: int = 100,
+    min_jacobian_ratio: float = 0.01,
+    fixed_nodes: Optional[npt.NDArray[np.bool_]] = None,
+) -> Mesh:
+    """untangles inverted elements of a 2D mesh by raising the jacobian of each corner above a minimum
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to untangle
+
+    num_iterations: int
+        maximum number of Jacobi iterations
+
+    min_jacobian_ratio: float
+        minimum corner jacobian as a ratio of the mean absolute corner jacobian
+
+    fixed_nodes: NDArray
+        mask of additional nodes to keep in place
+
+    Each iteration moves the free nodes of every corner below the minimum with the minimum
+    norm step of the linearized jacobian, averaging the steps of corners sharing a node.
+    """
+    corners = get_corners(get_polygons(mesh))
+    nodes, prev_nodes, next_nodes = corners
+    is_free = ~get_fixed_nodes(mesh, corners, fixed_nodes)
+
+    coords = np.array(mesh.points[:, :2], dtype=np.float64)
+    jacobians = get_corner_jacobians(coords, corners)
+    min_jacobian = min_jacobian_ratio*np.abs(jacobians).mean()
+    for _ in range(num_iterations):
+        is_bad = jacobians < min_jacobian
+        if not is_bad.any():
+            break
+        bad_nodes, bad_prev_nodes, bad_next_nodes = nodes[is_bad], prev_nodes[is_bad], next_nodes[is_bad]
+        to_next = coords[bad_next_nodes] - coords[bad_nodes]
+        to_prev = coords[bad_prev_nodes] - coords[bad_nodes]
+
+        # gradients of the corner jacobian to_next x to_prev with respect to its nodes
+        next_gradients = np.column_stack([to_prev[:, 1], -to_prev[:, 0]])
+        prev_gradients = np.column_stack([-to_next[:, 1], to_next[:, 0]])
+        node_gradients = -(next_gradients + prev_gradients)
+        corner_nodes = np.concatenate([bad_nodes, bad_prev_nodes, bad_next_nodes])
+        gradients = np.concatenate([node_gradients, prev_gradients, next_gradients])*is_free[corner_nodes, None]
+
+        # aim past the minimum so corners don't stall just below it
+        norms = (gradients**2).sum(axis=1).reshape((3, -1)).sum(axis=0)
+        step_sizes = np.tile((2*min_jacobian - jacobians[is_bad]) / np.maximum(norms, np.finfo(float).tiny), 3)
+        steps = gradients*step_sizes[:, None]
+        num_steps = np.maximum(np.bincount(corner_nodes, minlength=len(coords)), 1)
+        coords[:, 0] += np.bincount(corner_nodes, steps[:, 0], minlength=len(coords)) / num_steps
+        coords[:, 1] += np.bincount(corner_nodes, steps[:, 1], minlength=len(coords)) / num_steps
+        jacobians = get_corner_jacobians(coords, corners)
+
+    points = mesh.points.copy()
+    points[:, :2] = coords
+    return replace(mesh, points=points)
@@ -0,0 +1,230 @@
+from typing import Dict, List, Optional, Tuple, cast
+import numpy as np
+import numpy.typing as npt
+from .geometry import CurveLoop, Line, PlaneSurface, Point, SegmentType, TransfiniteCurveField, TransfiniteSurfaceField
+from .mesh import ElementType, Mesh
+from .utils.geometry import PropertyType, get_bspline, get_group_name, get_property
+
+
+def get_progression_sampling(num_cells: int, coef: float):
+    "get parameters of a geometric progression with ratio coef between successive cells, reversed if coef is negative"
+    ratio = abs(coef)
+    if np.isclose(ratio, 1.0):
+        sampling = np.linspace(0.0, 1.0, num_cells+1)
+    else:
+        sampling = (ratio**np.arange(num_cells+1) - 1) / (ratio**num_cells - 1)
+    return 1 - sampling[::-1] if coef < 0 else sampling
+
+
+def get_bump_sampling(num_cells: int, coef: float, num_samples: int = 1000):
+    "get parameters with sizes at both ends coef times the size in the middle"
+    # integrate the size function h(t) = 1 + (coef - 1)(2t - 1)^2 and invert the cumulative density of 1/h
+    fine_sampling = np.linspace(0.0, 1.0, num_samples)
+    density = 1 / (1 + (coef - 1)*(2*fine_sampling - 1)**2)
+    cumulative_density = np.concatenate([[0.0], np.cumsum(0.5*(density[1:] + density[:-1])*np.diff(fine_sampling))])
+    return np.interp(np.linspace(0.0, cumulative_density[-1], num_cells+1), cumulative_density, fine_sampling)
+
+
+def get_transfinite_sampling(num_cells: int, mesh_type: str, coef: float):
+    if mesh_type == "Progression":
+        return get_progression_sampling(num_cells, coef)
+    elif mesh_type == "Bump":
+        return get_bump_sampling(num_cells, coef)
+    raise ValueError(f"Transfinite mesh type {mesh_type} not supported")
+
+
+def get_segment_coords(segment: SegmentType, sampling: npt.NDArray[np.float64]):
+    "get coordinates of a segment at the parameters"
+    if isinstance(segment, Line):
+        start, end = np.asarray(segment.start.coord)[:2], np.asarray(segment.end.coord)[:2]
+        return start + sampling[:, None]*(end - start)
+    ctrl_point_coords = np.array([np.asarray(ctrl_point.coord)[:2] for ctrl_point in segment.ctrl_points])
+    if segment.type == "Bezier":
+        curve = get_bspline(ctrl_point_coords, len(ctrl_point_coords) - 1)
+    elif segment.type == "Spline":
+        from scipy.interpolate import make_interp_spline
+        curve = make_interp_spline(np.linspace(0.0, 1.0, len(ctrl_point_coords)), ctrl_point_coords, k=min(3, len(ctrl_point_coords) - 1))
+    else:
+        curve = get_bspline(ctrl_point_coords, 3)
+    coords = curve(sampling)
+    # clamped ends are exact at the control points
+    coords[0], coords[-1] = ctrl_point_coords[0], ctrl_point_coords[-1]
+    return coords
+
+
+def get_sides(curve_loop: CurveLoop, corners: List[Point]) -> List[List[int]]:
+    "get the segment indices of the four sides of a curve loop starting at each corner"
+    assert len(corners) == 4, "transfinite surfaces require 4 corners"
+    corner_coords = [tuple(np.asarray(corner.coord)[:2]) for corner in corners]
+    start_coords = [tuple(np.asarray(segment.start.coord)[:2]) for segment in curve_loop.segments]
+    corner_segment_indices = []
+    for corner_coord in corner_coords:
+        if corner_coord not in start_coords:
+            raise ValueError(f"Corner {corner_coord} is not a segment start point of the curve loop")
+        corner_segment_indices.append(start_coords.index(corner_coord))
+
+    num_segments = len(curve_loop.segments)
+    sides = []
+    for i, start_index in enumerate(corner_segment_indices):
+        end_index = corner_segment_indices[(i+1) % 4]
+        num_side_segments = (end_index - start_index) % num_segments
+        sides.append([(start_index + j) % num_segments for j in range(num_side_segments)])
+    assert sum(len(side) for side in sides) == num_segments, "corners must be in the order of the curve loop"
+    return sides
+
+
+def get_transfinite_coords(
+    bottom: npt.NDArray[np.float64],
+    right: npt.NDArray[np.float64],
+    top: npt.NDArray[np.float64],
+    left: npt.NDArray[np.float64],
+):
+    """get (num_t, num_s, 2) coordinates of a Coons patch transfinite interpolation
+
+    bottom and top go from left to right, left and right go from bottom to top.
+    Boundary node distributions are blended with their normalized arc lengths.
+    """
+    def get_arc_length_fractions(coords: npt.NDArray[np.float64]):
+        arc_lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))])
+        return arc_lengths / arc_lengths[-1]
+
+    u_bottom, u_top = get_arc_length_fractions(bottom)[None, :], get_arc_length_fractions(top)[None, :]
+    v_left, v_right = get_arc_length_fractions(left)[:, None], get_arc_length_fractions(right)[:, None]
+    denominator = 1 - (u_top - u_bottom)*(v_right - v_left)
+    s = (u_bottom + v_left*(u_top - u_bottom)) / denominator
+    t = (v_left + u_bottom*(v_right - v_left)) / denominator
+    s, t = s[..., None], t[..., None]
+
+    return (
+        (1 - t)*bottom[None, :, :] + t*top[None, :, :]
+        + (1 - s)*left[:, None, :] + s*right[:, None, :]
+        - (1 - s)*(1 - t)*bottom[0] - s*(1 - t)*bottom[-1] - s*t*top[-1] - (1 - s)*t*top[0]
+    )
+
+
+def smooth_elliptic(coords: npt.NDArray[np.float64], num_iterations: int, relaxation: float = 1.0):
+    "smooths interior nodes of (num_t, num_s, 2) structured coordinates with Jacobi iterations of the Winslow equations"
+    coords = coords.copy()
+    for _ in range(num_iterations):
+        x_s = 0.5*(coords[1:-1, 2:] - coords[1:-1, :-2])
+        x_t = 0.5*(coords[2:, 1:-1] - coords[:-2, 1:-1])
+        alpha = (x_t**2).sum(axis=-1, keepdims=True)
+        beta = (x_s*x_t).sum(axis=-1, keepdims=True)
+        gamma = (x_s**2).sum(axis=-1, keepdims=True)
+        cross_derivative = coords[2:, 2:] - coords[2:, :-2] - coords[:-2, 2:] + coords[:-2, :-2]
+        smoothed = (
+            alpha*(coords[1:-1, 2:] + coords[1:-1, :-2])
+            + gamma*(coords[2:, 1:-1] + coords[:-2, 1:-1])
+            - 0.5*beta*cross_derivative
+        ) / (2*(alpha + gamma))
+        coords[1:-1, 1:-1] += relaxation*(smoothed - coords[1:-1, 1:-1])
+    return coords
+
+
+def generate_transfinite_mesh(
+    curve_loop: CurveLoop,
+    corners: List[Point],
+    node_counts: PropertyType[int],
+    mesh_types: Optional[PropertyType[str]] = None,
+    coefs: Optional[PropertyType[float]] = None,
+    smoothing_iterations: int = 0,
+) -> Mesh:
+    """generates a structured quadrilateral mesh of a four sided curve loop without gmsh
+
+    Parameters
+    ==========
+
+    curve_loop: CurveLoop
+        curve loop of the surface
+
+    corners: List[Point]
+        four corners of the surface in the order of the curve loop
+
+    node_counts: PropertyType[int]
+        number of cells per segment, as in TransfiniteCurveField
+
+    mesh_types: PropertyType[str]
+        distribution per segment, "Progression" or "Bump"
+
+    coefs: PropertyType[float]
+        progression ratio or bump coefficient per segment
+
+    smoothing_iterations: int
+        number of elliptic smoothing iterations of the interior nodes
+    """
+    # sample each side from the corner it starts at, sharing the end node of each segment with the next
+    side_coords: List[npt.NDArray[np.float64]] = []
+    segment_ranges: Dict[int, Tuple[int, int, int]] = {}
+    for side_index, side in enumerate(get_sides(curve_loop, corners)):
+        coords = []
+        num_side_nodes = 0
+        for segment_index in side:
+            segment = curve_loop.segments[segment_index]
+            num_cells = get_property(node_counts, segment_index, segment.label)
+            mesh_type = get_property(mesh_types, segment_index, segment.label, "Progression")
+            coef = get_property(coefs, segment_index, segment.label, 1.0)
+            segment_coords = get_segment_coords(segment, get_transfinite_sampling(num_cells, mesh_type, coef))
+            coords.append(segment_coords if len(coords) == 0 else segment_coords[1:])
+            segment_ranges[segment_index] = (side_index, num_side_nodes, num_side_nodes + num_cells)
+            num_side_nodes += num_cells
+        side_coords.append(np.concatenate(coords))
+
+    bottom, right, top, left = side_coords[0], side_coords[1], side_coords[2][::-1], side_coords[3][::-1]
+    if len(bottom) != len(top) or len(left) != len(right):
+        raise ValueError(f"Opposite sides must have the same number of nodes, got {len(bottom)}, {len(right)}, {len(top)}, {len(left)}")
+
+    coords = get_transfinite_coords(bottom, right, top, left)
+    if smoothing_iterations > 0:
+        coords = smooth_elliptic(coords, smoothing_iterations)
+    num_t, num_s = coords.shape[:2]
+    points = np.zeros((num_t*num_s, 3))
+    points[:, :2] = coords.reshape((-1, 2))
+
+    node_indices = np.arange(num_t*num_s, dtype=np.uint32).reshape((num_t, num_s))
+    quads = np.stack([
+        node_indices[:-1, :-1], node_indices[:-1, 1:], node_indices[1:, 1:], node_indices[1:, :-1]
+    ], axis=-1).reshape((-1, 4))
+    # keep quadrilaterals counter-clockwise for clockwise curve loops
+    boundary_coords = np.concatenate(side_coords)
+    if np.sum(boundary_coords[:, 0]*np.roll(boundary_coords[:, 1], -1) - np.roll(boundary_coords[:, 0], -1)*boundary_coords[:, 1]) < 0:
+        quads = quads[:, ::-1]
+
+    # boundary node indices of each side in the direction of the curve loop
+    side_node_indices = [node_indices[0, :], node_indices[:, -1], node_indices[-1, ::-1], node_indices[::-1, 0]]
+    markers: Dict[str, List[npt.NDArray[np.uint32]]] = {}
+    for segment_index, segment in enumerate(curve_loop.segments):
+        if segment.label is None:
+            continue
+        side_index, start, end = segment_ranges[segment_index]
+        segment_node_indices = side_node_indices[side_index][start:end+1]
+        marker_name = get_group_name(segment.label)
+        if marker_name not in markers:
+            markers[marker_name] = []
+        markers[marker_name] += list(np.column_stack([segment_node_indices[:-1], segment_node_indices[1:]]))
+
+    return Mesh(
+        2,
+        list(quads),
+        [ElementType.QUADRILATERAL] * len(quads),
+        points,
+        markers,
+    )
+
+
+def generate_structured_mesh(surface: PlaneSurface, smoothing_iterations: int = 0) -> Mesh:
+    "generates a structured quadrilateral mesh of a surface with transfinite fields without gmsh"
+    assert len(surface.outlines) == 1 and len(surface.holes) == 0, "structured surfaces must have one outline and no holes"
+    curve_loop = surface.outlines[0]
+    surface_fields = [field for field in surface.fields if isinstance(field, TransfiniteSurfaceField) and field.corners is not None]
+    curve_fields = [field for field in curve_loop.fields if isinstance(field, TransfiniteCurveField)]
+    if len(surface_fields) == 0 or len(curve_fields) == 0:
+        raise ValueError("Structured surfaces require a TransfiniteSurfaceField with corners and a TransfiniteCurveField")
+    curve_field = curve_fields[0]
+    return generate_transfinite_mesh(
+        curve_loop,
+        cast(List[Point], surface_fields[0].corners),
+        curve_field.node_counts,
+        curve_field.mesh_types,
+        curve_field.coefs,
+        smoothing_iterations,
+    )
@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Sequence, Union
+import numpy as np
+import numpy.typing as npt
+from .mesh import ElementType, Mesh
+
+CoordType = Union[npt.NDArray[np.float64], Sequence[float]]
+
+
+def select_by_bounding_box(mesh: Mesh, min_coord: CoordType, max_coord: CoordType) -> npt.NDArray[np.intp]:
+    "selects elements with centroids inside of the bounding box"
+    centroids = mesh.get_cell_centroids()
+    min_coord, max_coord = np.asarray(min_coord), np.asarray(max_coord)
+    num_axes = len(min_coord)
+    is_inside = ((centroids[:, :num_axes] >= min_coord) & (centroids[:, :num_axes] <= max_coord)).all(axis=1)
+    return np.flatnonzero(is_inside)
+
+
+def select_by_predicate(mesh: Mesh, predicate: Callable[[npt.NDArray[np.float64]], npt.NDArray[np.bool_]]) -> npt.NDArray[np.intp]:
+    "selects elements for which the vectorized predicate on the (num_elements, 3) centroids is true"
+    return np.flatnonzero(predicate(mesh.get_cell_centroids()))
+
+
+def select_by_element_type(mesh: Mesh, element_types: Union[ElementType, List[ElementType]]) -> npt.NDArray[np.intp]:
+    "selects elements of the element types"
+    if not isinstance(element_types, list):
+        element_types = [element_types]
+    element_groups = mesh.get_element_groups()
+    selected_indices = [element_groups[element_type][0] for element_type in element_types if element_type in element_groups]
+    if len(selected_indices) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.sort(np.concatenate(selected_indices))
+
+
+def select_by_marker_distance(mesh: Mesh, marker_names: Union[str, List[str]], distance: float) -> npt.NDArray[np.intp]:
+    """selects elements with a node within distance of the markers
+
+    Distances to line markers of 2D meshes are exact, distances to the face markers of 3D meshes
+    are measured to their nodes, so a node near the middle of a large face can be missed.
+    """
+    from scipy.spatial import cKDTree
+    from .distance import get_wall_distances
+    if not isinstance(marker_names, list):
+        marker_names = [marker_names]
+    for marker_name in marker_names:
+        if marker_name not in mesh.markers:
+            raise ValueError(f"Marker '{marker_name}' not found in mesh")
+    is_line_marker = all(len(marker_element) == 2 for marker_name in marker_names for marker_element in mesh.markers[marker_name])
+    if is_line_marker:
+        node_distances = get_wall_distances(mesh, marker_names)
+    else:
+        marker_nodes = np.unique(np.concatenate([np.concatenate(mesh.markers[marker_name]) for marker_name in marker_names]))
+        node_distances, _ = cKDTree(mesh.points[marker_nodes]).query(mesh.points, distance_upper_bound=distance)
+    is_near_node = node_distances <= distance
+
+    is_near_element = np.zeros(len(mesh.elements), dtype=bool)
+    for element_indices, connectivity in mesh.get_element_groups().values():
+        is_near_element[element_indices] = is_near_node[connectivity].any(axis=1)
+    return np.flatnonzero(is_near_element)
+
+
+def get_contiguous_range(element_indices: npt.NDArray[np.intp]):
+    "get (start, end) if sorted element indices are a contiguous range, else None"
+    if len(element_indices) == 0:
+        return None
+    start, end = int(element_indices[0]), int(element_indices[-1]) + 1
+    if end - start == len(element_indices):
+        return start, end
+    return None
+
+
+def remap_elements(elements: List[npt.NDArray], node_indices: npt.NDArray[np.int64], is_node_used: npt.NDArray[np.bool_]):
+    "remaps the nodes of elements with all nodes used, returning the remapped elements and their mask"
+    if len(elements) == 0:
+        return [], np.empty(0, dtype=bool)
+    element_lengths = np.fromiter(map(len, elements), dtype=np.intp, count=len(elements))
+    flat_nodes = np.concatenate(elements).astype(np.intp, copy=False)
+    element_starts = np.concatenate([[0], np.cumsum(element_lengths)[:-1]])
+    # an element is kept when the number of its used nodes equals its length
+    num_used_nodes = np.add.reduceat(is_node_used[flat_nodes].astype(np.intp), element_starts)
+    is_kept = num_used_nodes == element_lengths
+    is_flat_kept = np.repeat(is_kept, element_lengths)
+    remapped_nodes = node_indices[flat_nodes[is_flat_kept]].astype(np.uint32)
+    remapped_elements = np.split(remapped_nodes, np.cumsum(element_lengths[is_kept])[:-1]) if is_kept.any() else []
+    return remapped_elements, is_kept
+
+
+def extract_submesh(mesh: Mesh, element_indices: npt.NDArray[np.intp], is_view: bool = False) -> Mesh:
+    """extracts a compacted mesh of the selected elements with renumbered nodes
+
+    Parameters
+    ==========
+
+    mesh: Mesh
+        mesh to extract elements from
+
+    element_indices: NDArray
+        indices of the selected elements, i.e. from a select_by_* function
+
+    is_view: bool
+        if true and the selection is a contiguous range of elements, the elements, points and
+        point data of the submesh share memory with the mesh and nodes are not renumbered
+
+    Markers keep the marker elements with all nodes in the submesh.
+    """
+    element_indices = np.unique(np.asarray(element_indices, dtype=np.intp))
+    contiguous_range = get_contiguous_range(element_indices) if is_view else None
+
+    if contiguous_range is not None:
+        start, end = contiguous_range
+        elements = mesh.elements[start:end]
+        is_node_used = np.zeros(len(mesh.points), dtype=bool)
+        if len(elements) > 0:
+            is_node_used[np.concatenate(elements)] = True
+        node_indices = np.arange(len(mesh.points))
+        element_types = mesh.element_types[start:end]
+        points = mesh.points
+        point_data = dict(mesh.point_data)
+        cell_data = {name: values[start:end] for name, values in mesh.cell_data.items()}
+    else:
+        selected_elements = [mesh.elements[i] for i in element_indices]
+        is_node_used = np.zeros(len(mesh.points), dtype=bool)
+        if len(selected_elements) > 0:
+            is_node_used[np.concatenate(selected_elements)] = True
+        node_indices = np.cumsum(is_node_used) - 1
+        elements, _ = remap_elements(selected_elements, node_indices, is_node_used)
+        element_types = [mesh.element_types[i] for i in element_indices]
+        points = mesh.points[is_node_used]
+        point_data = {name: values[is_node_used] for name, values in mesh.point_data.items()}
+        cell_data = {name: values[element_indices] for name, values in mesh.cell_data.items()}
+
+    markers: Dict[str, List[npt.NDArray[np.uint32]]] = {}
+    for marker_name, marker_elements in mesh.markers.items():
+        remapped_marker_elements, _ = remap_elements(marker_elements, node_indices, is_node_used)
+        if len(remapped_marker_elements) > 0:
+            markers[marker_name] = remapped_marker_elements
+
+    target_points: Dict[str, Dict[np.uint32, str]] = {}
+    for marker_name, marker_target_points in mesh.target_points.items():
+        if marker_name not in markers:
+            continue
+        target_points[marker_name] = {
+            np.uint32(node_indices[point_index]): name
+            for point_index, name in marker_target_points.items()
+            if is_node_used[point_index]
+        }
+
+    return Mesh(
+        mesh.dim,
+        elements,
+        element_types,
+        points,
+        markers,
+        target_points,
+        point_data,
+        cell_data,
+    )
@@ -1,8 +1,10 @@
-from typing import Optional, TypeVar, Union, List, Dict, cast
-from scipy.interpolate import BSpline
+from typing import TYPE_CHECKING, Optional, TypeVar, Union, List, Dict, cast
 import numpy as np
 import numpy.typing as npt
 
+if TYPE_CHECKING:
+    from scipy.interpolate import BSpline
+
 T = TypeVar('T')
 PropertyType = Union[List[T], T, Dict[str, T]]
 
@@ -40,6 +42,7 @@ def get_sampling(num_samples: int, is_cosine_sampling: bool):
 
 def get_bspline(ctrl_pnts: npt.NDArray, degree: int):
     "get a bspline with clamped knots"
+    from scipy.interpolate import BSpline
     num_ctrl_pnts = ctrl_pnts.shape[0]
     knots = np.pad(
         array=np.linspace(0, 1, (num_ctrl_pnts + 1) - degree),
@@ -48,3 +51,23 @@ def get_bspline(ctrl_pnts: npt.NDArray, degree: int):
         constant_values=(0, 1)
     )
     return BSpline(knots, ctrl_pnts, degree, extrapolate=False)
+
+
+def get_curvature(bspline: "BSpline", sampling: npt.NDArray[np.float64]):
+    "get curvature of a 2D or 3D curve at the sampled parameters"
+    first_derivative = bspline.derivative(1)(sampling)
+    second_derivative = bspline.derivative(2)(sampling)
+    if first_derivative.shape[1] == 2:
+        numerator = np.abs(first_derivative[:, 0]*second_derivative[:, 1] - first_derivative[:, 1]*second_derivative[:, 0])
+    else:
+        numerator = np.linalg.norm(np.cross(first_derivative, second_derivative), axis=1)
+    speed = np.linalg.norm(first_derivative, axis=1)
+    return np.divide(numerator, speed**3, out=np.zeros_like(speed), where=speed > 0)
+
+
+def get_view_list_data(points: npt.NDArray[np.float64], cells: npt.NDArray, values: npt.NDArray[np.float64]):
+    "get flattened gmsh list data of nodal values on cells (coordinates per axis followed by values per node)"
+    cell_points = np.zeros((len(cells), cells.shape[1], 3))
+    cell_points[:, :, :points.shape[1]] = points[cells]
+    cell_values = values[cells].reshape((len(cells), -1))
+    return np.concatenate([cell_points.transpose((0, 2, 1)).reshape((len(cells), -1)), cell_values], axis=1).ravel()
@@ -0,0 +1,208 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import shlex
+import numpy as np
+import numpy.typing as npt
+
+MSH_NUM_NODES = {1: 2, 2: 3, 3: 4, 4: 4, 5: 8, 6: 6, 7: 5, 15: 1}
+"number of nodes of each supported gmsh element type"
+
+BLOCK_HEADER_DTYPE = np.dtype([("dim", "<i4"), ("tag", "<i4"), ("type", "<i4"), ("size", "<u8")])
+"binary header of node and element blocks (entity dim, entity tag, parametric or element type, block size)"
+
+
+@dataclass
+class MshElementBlock:
+    dim: int
+    "dimension of the entity of the elements"
+
+    entity_tag: int
+    "tag of the entity of the elements"
+
+    element_type: int
+    "gmsh element type"
+
+    node_tags: npt.NDArray[np.uint64]
+    "(num_elements, num_nodes) node tags of each element"
+
+
+@dataclass
+class MshData:
+    version: str
+    "version of the file format"
+
+    node_tags: npt.NDArray[np.uint64] = field(default_factory=lambda: np.empty(0, dtype=np.uint64))
+    "tag of each node"
+
+    points: npt.NDArray[np.float64] = field(default_factory=lambda: np.empty((0, 3)))
+    "(num_nodes, 3) coordinates of each node"
+
+    element_blocks: List[MshElementBlock] = field(default_factory=list)
+    "element blocks of each entity"
+
+    entity_physical_tags: Dict[Tuple[int, int], List[int]] = field(default_factory=dict)
+    "physical group tags of each (dim, tag) entity"
+
+    physical_names: Dict[Tuple[int, int], str] = field(default_factory=dict)
+    "name of each (dim, tag) physical group"
+
+
+class MshReader:
+    "reads sections of a MSH 4.1 file in bulk, with np.frombuffer for binary sections"
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+        self.is_binary = False
+
+    def read_line(self):
+        end = self.data.find(b"\n", self.position)
+        end = len(self.data) if end == -1 else end
+        line = self.data[self.position:end].decode(errors="replace").strip()
+        self.position = end + 1
+        return line
+
+    def read_array(self, dtype: npt.DTypeLike, count: int):
+        array = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.position)
+        self.position += array.nbytes
+        return array
+
+    def read_ascii_section(self, name: str, dtype: npt.DTypeLike = np.float64):
+        "get numbers of an ASCII section until its end marker"
+        end = self.data.find(f"$End{name}".encode(), self.position)
+        if end == -1:
+            raise ValueError(f"MSH section ${name} has no end marker")
+        section = self.data[self.position:end]
+        self.position = end
+        return np.fromstring(section.decode(), dtype=dtype, sep=" ")
+
+    def skip_section(self, name: str):
+        end = self.data.find(f"$End{name}".encode(), self.position)
+        if end == -1:
+            raise ValueError(f"MSH section ${name} has no end marker")
+        self.position = end
+        self.read_line()
+
+    def read_mesh_format(self, msh_data: MshData):
+        version, file_type, _ = self.read_line().split()
+        msh_data.version = version
+        self.is_binary = file_type == "1"
+        if self.is_binary:
+            if self.read_array("<i4", 1)[0] != 1:
+                raise ValueError("Big endian MSH files are not supported")
+            self.read_line()
+
+    def read_physical_names(self, msh_data: MshData):
+        num_physical_names = int(self.read_line())
+        for _ in range(num_physical_names):
+            dim, tag, name = shlex.split(self.read_line())
+            msh_data.physical_names[(int(dim), int(tag))] = name
+
+    def read_entities(self, msh_data: MshData):
+        if self.is_binary:
+            num_entities = self.read_array("<u8", 4)
+            for dim, num_dim_entities in enumerate(num_entities):
+                for _ in range(int(num_dim_entities)):
+                    tag = int(self.read_array("<i4", 1)[0])
+                    self.read_array("<f8", 3 if dim == 0 else 6)
+                    num_physical_tags = int(self.read_array("<u8", 1)[0])
+                    msh_data.entity_physical_tags[(dim, tag)] = self.read_array("<i4", num_physical_tags).tolist()
+                    if dim > 0:
+                        num_bounding_entities = int(self.read_array("<u8", 1)[0])
+                        self.read_array("<i4", num_bounding_entities)
+        else:
+            num_entities = [int(value) for value in self.read_line().split()]
+            for dim, num_dim_entities in enumerate(num_entities):
+                for _ in range(num_dim_entities):
+                    values = self.read_line().split()
+                    # points have coordinates, other entities have bounding boxes
+                    num_physical_tags_index = 4 if dim == 0 else 7
+                    num_physical_tags = int(values[num_physical_tags_index])
+                    physical_tags = values[num_physical_tags_index+1:num_physical_tags_index+1+num_physical_tags]
+                    msh_data.entity_physical_tags[(dim, int(values[0]))] = [int(physical_tag) for physical_tag in physical_tags]
+
+    def read_nodes(self, msh_data: MshData):
+        node_tags, points = [], []
+        if self.is_binary:
+            num_blocks, num_nodes, _, _ = self.read_array("<u8", 4)
+            for _ in range(int(num_blocks)):
+                block_header = self.read_array(BLOCK_HEADER_DTYPE, 1)[0]
+                dim, is_parametric, num_block_nodes = int(block_header["dim"]), int(block_header["type"]), int(block_header["size"])
+                node_tags.append(self.read_array("<u8", num_block_nodes))
+                num_coords = 3 + dim*is_parametric
+                points.append(self.read_array("<f8", num_block_nodes*num_coords).reshape((-1, num_coords))[:, :3])
+        else:
+            values = self.read_ascii_section("Nodes")
+            num_blocks, num_nodes = int(values[0]), int(values[1])
+            offset = 4
+            for _ in range(num_blocks):
+                dim, _, is_parametric, num_block_nodes = values[offset:offset+4].astype(np.int64)
+                offset += 4
+                node_tags.append(values[offset:offset+num_block_nodes].astype(np.uint64))
+                offset += num_block_nodes
+                num_coords = 3 + dim*is_parametric
+                points.append(values[offset:offset+num_block_nodes*num_coords].reshape((-1, num_coords))[:, :3])
+                offset += num_block_nodes*num_coords
+        msh_data.node_tags = np.concatenate(node_tags) if node_tags else np.empty(0, dtype=np.uint64)
+        msh_data.points = np.concatenate(points) if points else np.empty((0, 3))
+        assert len(msh_data.node_tags) == num_nodes, "number of nodes doesn't match MSH header"
+
+    def read_elements(self, msh_data: MshData):
+        if self.is_binary:
+            num_blocks = int(self.read_array("<u8", 4)[0])
+            for _ in range(num_blocks):
+                block_header = self.read_array(BLOCK_HEADER_DTYPE, 1)[0]
+                element_type, num_block_elements = int(block_header["type"]), int(block_header["size"])
+                num_nodes = get_num_nodes(element_type)
+                block = self.read_array("<u8", num_block_elements*(num_nodes+1)).reshape((-1, num_nodes+1))
+                msh_data.element_blocks.append(MshElementBlock(int(block_header["dim"]), int(block_header["tag"]), element_type, block[:, 1:]))
+        else:
+            values = self.read_ascii_section("Elements", np.int64)
+            num_blocks = int(values[0])
+            offset = 4
+            for _ in range(num_blocks):
+                dim, tag, element_type, num_block_elements = values[offset:offset+4].astype(np.int64)
+                offset += 4
+                num_nodes = get_num_nodes(int(element_type))
+                block = values[offset:offset+num_block_elements*(num_nodes+1)].astype(np.uint64).reshape((-1, num_nodes+1))
+                offset += num_block_elements*(num_nodes+1)
+                msh_data.element_blocks.append(MshElementBlock(int(dim), int(tag), int(element_type), block[:, 1:]))
+
+
+def get_num_nodes(element_type: int):
+    if element_type not in MSH_NUM_NODES:
+        raise ValueError(f"MSH element type {element_type} not supported")
+    return MSH_NUM_NODES[element_type]
+
+
+def read_msh(file_path: str) -> MshData:
+    """reads nodes, elements, entities and physical names of a MSH file
+
+    Only version 4.1 is parsed, other versions are returned with their version and no data.
+    """
+    with open(file_path, "rb") as file:
+        reader = MshReader(file.read())
+
+    msh_data = MshData(version="")
+    while reader.position < len(reader.data):
+        line = reader.read_line()
+        if not line.startswith("$"):
+            continue
+        name = line[1:]
+        if name == "MeshFormat":
+            reader.read_mesh_format(msh_data)
+            if msh_data.version != "4.1":
+                return msh_data
+        elif name == "PhysicalNames":
+            reader.read_physical_names(msh_data)
+        elif name == "Entities":
+            reader.read_entities(msh_data)
+        elif name == "Nodes":
+            reader.read_nodes(msh_data)
+        elif name == "Elements":
+            reader.read_elements(msh_data)
+        else:
+            reader.skip_section(name)
+            continue
+        reader.skip_section(name)
+    return msh_data
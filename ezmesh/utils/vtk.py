@@ -0,0 +1,213 @@
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List
+import base64
+import zlib
+import numpy as np
+import numpy.typing as npt
+from ..mesh import ElementType, Mesh
+
+VTK_CELL_TYPES = {
+    ElementType.POINT: 1,
+    ElementType.LINE: 3,
+    ElementType.TRIANGLE: 5,
+    ElementType.QUADRILATERAL: 9,
+    ElementType.TETRAHEDRON: 10,
+    ElementType.HEXAHEDRON: 12,
+    ElementType.PRISM: 13,
+    ElementType.PYRAMID: 14,
+}
+"VTK cell type of each element type"
+
+XDMF_CELL_TYPES = {
+    ElementType.POINT: 1,
+    ElementType.LINE: 2,
+    ElementType.TRIANGLE: 4,
+    ElementType.QUADRILATERAL: 5,
+    ElementType.TETRAHEDRON: 6,
+    ElementType.PYRAMID: 7,
+    ElementType.PRISM: 8,
+    ElementType.HEXAHEDRON: 9,
+}
+"XDMF mixed topology cell type of each element type, polyvertices and polylines are followed by their number of nodes"
+
+MARKER_ELEMENT_TYPES = {1: ElementType.POINT, 2: ElementType.LINE, 3: ElementType.TRIANGLE, 4: ElementType.QUADRILATERAL}
+"element type of marker elements by number of nodes"
+
+VTK_DATA_TYPES = {
+    np.dtype(np.int8): "Int8",
+    np.dtype(np.uint8): "UInt8",
+    np.dtype(np.int32): "Int32",
+    np.dtype(np.uint32): "UInt32",
+    np.dtype(np.int64): "Int64",
+    np.dtype(np.uint64): "UInt64",
+    np.dtype(np.float32): "Float32",
+    np.dtype(np.float64): "Float64",
+}
+
+VTU_BLOCK_SIZE = 1 << 20
+"uncompressed bytes per compressed block and per write of appended arrays"
+
+OFFSET_WIDTH = 20
+"digits reserved for appended data offsets, which are filled in once the data is written"
+
+
+@dataclass
+class ExportCells:
+    connectivity: npt.NDArray[np.int64]
+    "node indices of all cells, one after the other"
+
+    offsets: npt.NDArray[np.int64]
+    "end of each cell in the connectivity"
+
+    element_types: npt.NDArray[np.int32]
+    "element type value of each cell"
+
+    cell_data: Dict[str, npt.NDArray] = field(default_factory=dict)
+    "named field arrays defined on each cell"
+
+    marker_ids: Dict[str, int] = field(default_factory=dict)
+    "id of each marker in the marker cell data, -1 for mesh elements"
+
+
+def get_export_arrays(data: Dict[str, npt.NDArray]):
+    "get data arrays in types VTK and XDMF support"
+    arrays = {}
+    for name, values in data.items():
+        values = np.asarray(values)
+        if values.dtype == np.bool_:
+            values = values.astype(np.uint8)
+        elif values.dtype not in VTK_DATA_TYPES:
+            values = values.astype(np.float64)
+        arrays[name] = np.ascontiguousarray(values.reshape((len(values), -1)) if values.ndim > 2 else values)
+    return arrays
+
+
+def get_export_cells(mesh: Mesh) -> ExportCells:
+    "get the mesh elements followed by the marker elements as flat arrays, with markers as cell data"
+    marker_elements: List[npt.NDArray] = []
+    marker_values: List[npt.NDArray[np.int32]] = []
+    marker_ids: Dict[str, int] = {}
+    for marker_id, (marker_name, elements) in enumerate(mesh.markers.items()):
+        marker_ids[marker_name] = marker_id
+        marker_elements += elements
+        marker_values.append(np.full(len(elements), marker_id, dtype=np.int32))
+
+    all_elements = [*mesh.elements, *marker_elements]
+    lengths = np.fromiter(map(len, all_elements), dtype=np.int64, count=len(all_elements))
+    connectivity = np.concatenate(all_elements).astype(np.int64) if len(all_elements) > 0 else np.empty(0, dtype=np.int64)
+
+    element_type_values = np.fromiter((element_type.value for element_type in mesh.element_types), dtype=np.int32, count=len(mesh.element_types))
+    marker_type_values = np.array([element_type.value for element_type in MARKER_ELEMENT_TYPES.values()], dtype=np.int32)
+    marker_lengths = lengths[len(mesh.elements):]
+    if (marker_lengths > len(marker_type_values)).any():
+        raise ValueError("Marker elements must have at most 4 nodes")
+    element_types = np.concatenate([element_type_values, marker_type_values[marker_lengths - 1]])
+
+    num_marker_cells = len(marker_elements)
+    cell_data = {"marker": np.concatenate([np.full(len(mesh.elements), -1, dtype=np.int32), *marker_values])}
+    for name, values in get_export_arrays(mesh.cell_data).items():
+        assert len(values) == len(mesh.elements), f"cell data '{name}' must be defined for each element"
+        padding = np.full((num_marker_cells, *values.shape[1:]), np.nan if values.dtype.kind == "f" else 0, dtype=values.dtype)
+        cell_data[name] = np.concatenate([values, padding])
+
+    return ExportCells(connectivity, np.cumsum(lengths), element_types, cell_data, marker_ids)
+
+
+def get_cell_type_map(cell_types: Dict[ElementType, int]):
+    "get an array mapping element type values to cell types"
+    cell_type_map = np.zeros(max(element_type.value for element_type in ElementType) + 1, dtype=np.int64)
+    for element_type, cell_type in cell_types.items():
+        cell_type_map[element_type.value] = cell_type
+    return cell_type_map
+
+
+def get_bytes(array: npt.NDArray):
+    "get a byte view of an array without copying it"
+    return memoryview(np.ascontiguousarray(array)).cast("B")
+
+
+class Base64Writer:
+    "base64 encodes bytes written in chunks, keeping the remainder until a multiple of 3 bytes is available"
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.remainder = b""
+
+    def write(self, data: bytes):
+        data = self.remainder + bytes(data)
+        num_encoded_bytes = len(data) - len(data) % 3
+        self.file.write(base64.b64encode(data[:num_encoded_bytes]))
+        self.remainder = data[num_encoded_bytes:]
+
+    def flush(self):
+        self.file.write(base64.b64encode(self.remainder))
+        self.remainder = b""
+
+
+def write_vtu_array(file: BinaryIO, array: npt.NDArray, is_compressed: bool, is_base64: bool, block_size: int = VTU_BLOCK_SIZE):
+    """writes an appended VTU array with its UInt64 header in blocks of block_size bytes
+
+    Compressed arrays are written with a placeholder header that is filled in with the
+    compressed block sizes once the blocks are written.
+    """
+    data = get_bytes(array)
+    num_bytes = len(data)
+    if not is_compressed:
+        header = np.array([num_bytes], dtype=np.uint64).tobytes()
+        if is_base64:
+            file.write(base64.b64encode(header))
+            writer = Base64Writer(file)
+            for start in range(0, num_bytes, block_size):
+                writer.write(data[start:start+block_size])
+            writer.flush()
+        else:
+            file.write(header)
+            for start in range(0, num_bytes, block_size):
+                file.write(data[start:start+block_size])
+        return
+
+    num_blocks = -(-num_bytes // block_size)
+    header = np.zeros(3 + num_blocks, dtype=np.uint64)
+    header[:3] = [num_blocks, block_size, num_bytes - (num_blocks - 1)*block_size if num_blocks > 0 else 0]
+    encode_header = base64.b64encode if is_base64 else bytes
+    header_position = file.tell()
+    file.write(encode_header(header.tobytes()))
+
+    writer = Base64Writer(file) if is_base64 else file
+    for i, start in enumerate(range(0, num_bytes, block_size)):
+        compressed_block = zlib.compress(data[start:start+block_size])
+        header[3+i] = len(compressed_block)
+        writer.write(compressed_block)
+    if isinstance(writer, Base64Writer):
+        writer.flush()
+
+    end_position = file.tell()
+    file.seek(header_position)
+    file.write(encode_header(header.tobytes()))
+    file.seek(end_position)
+
+
+def write_binary_array(file: BinaryIO, array: npt.NDArray, block_size: int = VTU_BLOCK_SIZE):
+    "writes the raw bytes of an array in blocks of block_size bytes"
+    data = get_bytes(array)
+    for start in range(0, len(data), block_size):
+        file.write(data[start:start+block_size])
+
+
+def get_mixed_topology(cells: ExportCells):
+    "get the XDMF mixed topology array of cell types, numbers of nodes of polyvertices and polylines, and cell nodes"
+    lengths = np.diff(cells.offsets, prepend=0)
+    cell_types = get_cell_type_map(XDMF_CELL_TYPES)[cells.element_types]
+    has_length = (cell_types == XDMF_CELL_TYPES[ElementType.POINT]) | (cell_types == XDMF_CELL_TYPES[ElementType.LINE])
+    total_lengths = lengths + 1 + has_length
+    starts = np.cumsum(total_lengths) - total_lengths
+
+    topology = np.empty(int(total_lengths.sum()), dtype=np.int64)
+    is_node = np.ones(len(topology), dtype=bool)
+    topology[starts] = cell_types
+    is_node[starts] = False
+    length_positions = starts[has_length] + 1
+    topology[length_positions] = lengths[has_length]
+    is_node[length_positions] = False
+    topology[is_node] = cells.connectivity
+    return topology
@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+import numpy as np
+import numpy.typing as npt
+from .geometry import Curve, CurveLoop, ExtrudedSurface, MeshTransaction, PlaneSurface
+
+SAMPLES_PER_CTRL_POINT = 4
+"samples per control point of the curves of a curve loop"
+
+MAX_REPORTED_ISSUES = 10
+"number of issues listed in the message of a GeometryValidationError"
+
+
+class GeometryValidationError(ValueError):
+    "raised when curve loops intersect, aren't closed, have no area or holes are outside of their outline"
+
+    def __init__(self, issues: List[str]) -> None:
+        listed_issues = issues[:MAX_REPORTED_ISSUES]
+        if len(issues) > len(listed_issues):
+            listed_issues.append(f"... and {len(issues) - len(listed_issues)} more")
+        super().__init__("Invalid geometry:\n" + "\n".join(f"  {issue}" for issue in listed_issues))
+        self.issues = issues
+
+
+@dataclass
+class LoopEdges:
+    starts: npt.NDArray[np.float64]
+    "(num_edges, 2) start of each sampled edge of the curve loops"
+
+    ends: npt.NDArray[np.float64]
+    "(num_edges, 2) end of each sampled edge of the curve loops"
+
+    loop_indices: npt.NDArray[np.intp]
+    "curve loop of each edge"
+
+    segment_indices: npt.NDArray[np.intp]
+    "segment of each edge within its curve loop"
+
+    next_edges: npt.NDArray[np.intp]
+    "index of the following edge in the same curve loop"
+
+
+def get_segment_name(curve_loop: CurveLoop, segment_index: int):
+    "get the label and position of a segment in its curve loop"
+    segment = curve_loop.segments[segment_index]
+    segment_name = f"{segment.label} (segment {segment_index})" if segment.label else f"segment {segment_index}"
+    return f"{curve_loop.label}/{segment_name}" if curve_loop.label else segment_name
+
+
+def get_loop_edges(curve_loops: List[CurveLoop], samples_per_ctrl_point: int = SAMPLES_PER_CTRL_POINT):
+    "get the sampled edges of curve loops and issues of segments that don't connect"
+    starts, ends, loop_indices, segment_indices, next_edges = [], [], [], [], []
+    issues = []
+    num_edges = 0
+    for loop_index, curve_loop in enumerate(curve_loops):
+        num_ctrl_points = [len(segment.ctrl_points) for segment in curve_loop.segments if isinstance(segment, Curve)]
+        num_pnts = max([samples_per_ctrl_point*num_ctrl_point for num_ctrl_point in num_ctrl_points], default=2)
+        coords = curve_loop.get_exterior_coords(num_pnts, is_cosine_sampling=False)[:, :2]
+        num_segment_coords = [num_pnts if isinstance(segment, Curve) else 2 for segment in curve_loop.segments]
+        coord_segments = np.repeat(np.arange(len(curve_loop.segments)), num_segment_coords)
+
+        # edges between segments only join their ends, so they must have no length
+        loop_starts, loop_ends = coords, np.roll(coords, -1, axis=0)
+        edge_segments, next_segments = coord_segments, np.roll(coord_segments, -1)
+        is_joint = edge_segments != next_segments
+        is_gap = is_joint & (loop_starts != loop_ends).any(axis=1)
+        for segment_index, next_segment_index in zip(edge_segments[is_gap], next_segments[is_gap]):
+            issues.append(f"{get_segment_name(curve_loop, segment_index)} doesn't connect to {get_segment_name(curve_loop, next_segment_index)}")
+
+        is_edge = ~is_joint & (loop_starts != loop_ends).any(axis=1) | is_gap
+        loop_num_edges = int(is_edge.sum())
+        starts.append(loop_starts[is_edge])
+        ends.append(loop_ends[is_edge])
+        loop_indices.append(np.full(loop_num_edges, loop_index))
+        segment_indices.append(edge_segments[is_edge])
+        next_edges.append(num_edges + np.roll(np.arange(loop_num_edges), -1))
+        num_edges += loop_num_edges
+
+    loop_edges = LoopEdges(*(np.concatenate(arrays) for arrays in (starts, ends, loop_indices, segment_indices, next_edges)))
+    return loop_edges, issues
+
+
+def get_candidate_pairs(starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64]) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    """get pairs of edges with overlapping bounding boxes
+
+    Edges are swept along the axis their extents overlap least on, pairing each edge with the
+    edges that start before it ends, which are then pruned by the other axis.
+    """
+    min_coords, max_coords = np.minimum(starts, ends), np.maximum(starts, ends)
+    ranges = np.maximum(max_coords.max(axis=0) - min_coords.min(axis=0), np.finfo(np.float64).tiny)
+    axis = int(np.argmin((max_coords - min_coords).sum(axis=0) / ranges))
+
+    order = np.argsort(min_coords[:, axis], kind="stable")
+    sorted_min_coords = min_coords[order, axis]
+    sweep_ends = np.searchsorted(sorted_min_coords, max_coords[order, axis], side="right")
+    num_pairs = sweep_ends - np.arange(1, len(order) + 1)
+    first_positions = np.repeat(np.arange(len(order)), num_pairs)
+    second_positions = np.arange(len(first_positions)) - np.repeat(np.cumsum(num_pairs) - num_pairs, num_pairs) + first_positions + 1
+    first_edges, second_edges = order[first_positions], order[second_positions]
+
+    other_axis = 1 - axis
+    is_overlapping = (min_coords[first_edges, other_axis] <= max_coords[second_edges, other_axis]) & (min_coords[second_edges, other_axis] <= max_coords[first_edges, other_axis])
+    return first_edges[is_overlapping], second_edges[is_overlapping]
+
+
+def get_orientations(starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64], points: npt.NDArray[np.float64]):
+    "get the sign of the area of the triangles of edges and points, positive if counterclockwise"
+    directions, offsets = ends - starts, points - starts
+    return np.sign(directions[:, 0]*offsets[:, 1] - directions[:, 1]*offsets[:, 0])
+
+
+def get_intersecting_pairs(loop_edges: LoopEdges):
+    "get pairs of edges that cross or touch, and edges that fold back onto the following edge"
+    starts, ends, next_edges = loop_edges.starts, loop_edges.ends, loop_edges.next_edges
+    first_edges, second_edges = get_candidate_pairs(starts, ends)
+    is_adjacent = (next_edges[first_edges] == second_edges) | (next_edges[second_edges] == first_edges)
+    first_edges, second_edges = first_edges[~is_adjacent], second_edges[~is_adjacent]
+
+    # bounding boxes overlap, so the edges intersect when each has the other's ends on both sides or on it
+    first_starts, first_ends = starts[first_edges], ends[first_edges]
+    second_starts, second_ends = starts[second_edges], ends[second_edges]
+    is_intersecting = (
+        (get_orientations(first_starts, first_ends, second_starts)*get_orientations(first_starts, first_ends, second_ends) <= 0)
+        & (get_orientations(second_starts, second_ends, first_starts)*get_orientations(second_starts, second_ends, first_ends) <= 0)
+    )
+
+    # adjacent edges only intersect beyond their shared end when they are collinear and opposite
+    directions = ends - starts
+    next_directions = directions[next_edges]
+    is_folded = (directions[:, 0]*next_directions[:, 1] - directions[:, 1]*next_directions[:, 0] == 0) & ((directions*next_directions).sum(axis=1) < 0)
+    folded_edges = np.flatnonzero(is_folded)
+
+    return (
+        np.concatenate([first_edges[is_intersecting], folded_edges]),
+        np.concatenate([second_edges[is_intersecting], next_edges[folded_edges]]),
+    )
+
+
+def get_signed_areas(loop_edges: LoopEdges, num_loops: int):
+    "get the area of each curve loop, positive if counterclockwise"
+    starts, ends = loop_edges.starts, loop_edges.ends
+    cross_products = starts[:, 0]*ends[:, 1] - starts[:, 1]*ends[:, 0]
+    return 0.5*np.bincount(loop_edges.loop_indices, weights=cross_products, minlength=num_loops)
+
+
+def get_is_inside(point: npt.NDArray[np.float64], starts: npt.NDArray[np.float64], ends: npt.NDArray[np.float64]) -> bool:
+    "get if a point is inside of a polygon of edges by the parity of the edges crossing a ray from it"
+    is_straddling = (starts[:, 1] > point[1]) != (ends[:, 1] > point[1])
+    starts, ends = starts[is_straddling], ends[is_straddling]
+    crossings = starts[:, 0] + (point[1] - starts[:, 1])*(ends[:, 0] - starts[:, 0])/(ends[:, 1] - starts[:, 1])
+    return bool(np.count_nonzero(crossings > point[0]) % 2)
+
+
+def validate_curve_loops(
+    curve_loops: List[CurveLoop],
+    samples_per_ctrl_point: int = SAMPLES_PER_CTRL_POINT,
+    is_orientation_checked: bool = False,
+):
+    """checks that the outline and holes of a surface can be meshed, raising a GeometryValidationError with the offending segments
+
+    Parameters
+    ==========
+
+    curve_loops: List[CurveLoop]
+        outline followed by the hole curve loops of a surface
+
+    samples_per_ctrl_point: int
+        samples per control point of curves, lines are exact
+
+    is_orientation_checked: bool
+        if true, the outline must be counterclockwise and holes clockwise, gmsh meshes either orientation
+
+    Curve loops must be closed, have area and not intersect themselves or each other, and
+    holes must be inside of the outline and outside of each other.
+    """
+    loop_edges, issues = get_loop_edges(curve_loops, samples_per_ctrl_point)
+
+    first_edges, second_edges = get_intersecting_pairs(loop_edges)
+    loop_segments = [(loop_index, segment_index) for loop_index, curve_loop in enumerate(curve_loops) for segment_index in range(len(curve_loop.segments))]
+    segment_offsets = np.cumsum([0, *(len(curve_loop.segments) for curve_loop in curve_loops)])
+    first_segments = segment_offsets[loop_edges.loop_indices[first_edges]] + loop_edges.segment_indices[first_edges]
+    second_segments = segment_offsets[loop_edges.loop_indices[second_edges]] + loop_edges.segment_indices[second_edges]
+    segment_pairs = np.unique(np.stack([np.minimum(first_segments, second_segments), np.maximum(first_segments, second_segments)], axis=1), axis=0)
+    for first_segment, second_segment in segment_pairs.tolist():
+        first_name = get_segment_name(curve_loops[loop_segments[first_segment][0]], loop_segments[first_segment][1])
+        if first_segment == second_segment:
+            issues.append(f"{first_name} intersects itself")
+        else:
+            issues.append(f"{first_name} intersects {get_segment_name(curve_loops[loop_segments[second_segment][0]], loop_segments[second_segment][1])}")
+
+    signed_areas = get_signed_areas(loop_edges, len(curve_loops))
+    for loop_index, (curve_loop, signed_area) in enumerate(zip(curve_loops, signed_areas)):
+        loop_name = curve_loop.label or f"curve loop {loop_index}"
+        if signed_area == 0:
+            issues.append(f"{loop_name} has no area")
+        elif is_orientation_checked and (signed_area > 0) != (loop_index == 0):
+            issues.append(f"{loop_name} is {'counterclockwise' if signed_area > 0 else 'clockwise'}, {'holes' if loop_index else 'outlines'} must be {'clockwise' if loop_index else 'counterclockwise'}")
+
+    # containment of loops that don't cross is decided by any one of their points
+    if len(first_edges) == 0 and len(curve_loops) > 1:
+        loop_starts = np.searchsorted(loop_edges.loop_indices, np.arange(len(curve_loops) + 1))
+        loop_slices = [slice(start, end) for start, end in zip(loop_starts[:-1], loop_starts[1:])]
+        for hole_index in range(1, len(curve_loops)):
+            hole_name = curve_loops[hole_index].label or f"curve loop {hole_index}"
+            hole_point = loop_edges.starts[loop_slices[hole_index].start]
+            for loop_index, loop_slice in enumerate(loop_slices):
+                if loop_index == hole_index:
+                    continue
+                is_inside = get_is_inside(hole_point, loop_edges.starts[loop_slice], loop_edges.ends[loop_slice])
+                if loop_index == 0 and not is_inside:
+                    issues.append(f"{hole_name} is outside of its outline {curve_loops[0].label or 'curve loop 0'}")
+                elif loop_index > 0 and is_inside:
+                    issues.append(f"{hole_name} is inside of hole {curve_loops[loop_index].label or f'curve loop {loop_index}'}")
+
+    if len(issues) > 0:
+        raise GeometryValidationError(list(dict.fromkeys(issues)))
+
+
+def validate_transactions(transactions: Union[MeshTransaction, List[MeshTransaction]], samples_per_ctrl_point: int = SAMPLES_PER_CTRL_POINT):
+    "validates the curve loops of the surfaces and curve loops of transactions, see validate_curve_loops"
+    if not isinstance(transactions, list):
+        transactions = [transactions]
+    for transaction in transactions:
+        if isinstance(transaction, ExtrudedSurface):
+            transaction = transaction.surface
+        if isinstance(transaction, PlaneSurface):
+            validate_curve_loops(transaction.curve_loops, samples_per_ctrl_point)
+        elif isinstance(transaction, CurveLoop):
+            validate_curve_loops([transaction, *transaction.holes], samples_per_ctrl_point)
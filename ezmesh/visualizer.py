@@ -1,19 +1,17 @@
 from typing import Any, List, Union, cast
-from plotly import graph_objects as go
 from .mesh import Mesh
 from .utils.visualization import generate_color_legend_html, generate_rgb_values, to_rgb_str
-import pythreejs
-from IPython.display import display
-from IPython.core.display import HTML
-import ipywidgets as widgets
 import numpy as np
 
+# plotly, pythreejs, ipywidgets and IPython are imported when visualizing since they are slow to import
+
 def visualize_curve_loops(
         curve_loops: List[Any], 
         title: str = "Surface", 
         samples_per_spline: int = 20, 
         is_cosine_sampling: bool = True
     ):
+    from plotly import graph_objects as go
     from .geometry import CurveLoop
     curve_loops: List[CurveLoop] = cast(List[CurveLoop], curve_loops)
 
@@ -45,6 +43,11 @@ def visualize_curve_loops(
 
 
 def visualize_mesh(meshes: Union[Mesh, List[Mesh]], view_width=800, view_height=600):
+    import pythreejs
+    import ipywidgets as widgets
+    from IPython.display import display
+    from IPython.core.display import HTML
+
     coord_html = widgets.HTML("Coords: ()")
 
     def on_surf_mousemove(change):
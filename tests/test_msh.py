@@ -0,0 +1,74 @@
+"""
+Tests of the native MSH 4.1 reader against gmsh.
+
+The fixtures in tests/data are a square with a circular hole meshed with gmsh 4.15 and written
+with Mesh.MshFileVersion 4.1 as ASCII and binary (Mesh.Binary), in 2D and extruded to prisms in
+3D. The 3D files are written with Mesh.SaveParametric so parametric node coordinates are read.
+"""
+import os
+import gmsh
+import numpy as np
+import pytest
+from ezmesh.importers import import_from_gmsh, import_from_msh, import_from_msh_data
+from ezmesh.mesh import ElementType, Mesh
+from ezmesh.utils.msh import read_msh
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+FIXTURE_NAMES = ["square_2d_ascii", "square_2d_binary", "square_3d_ascii", "square_3d_binary"]
+
+
+def get_fixture_path(name: str):
+    return os.path.join(DATA_DIR, f"{name}.msh")
+
+
+def assert_meshes_equal(mesh: Mesh, expected_mesh: Mesh):
+    assert mesh.dim == expected_mesh.dim
+    np.testing.assert_array_equal(mesh.points, expected_mesh.points)
+    assert mesh.element_types == expected_mesh.element_types
+    np.testing.assert_array_equal(np.stack(mesh.elements), np.stack(expected_mesh.elements))
+    assert set(mesh.markers) == set(expected_mesh.markers)
+    for marker_name, marker_elements in mesh.markers.items():
+        np.testing.assert_array_equal(np.stack(marker_elements), np.stack(expected_mesh.markers[marker_name]))
+
+
+@pytest.mark.parametrize("name", FIXTURE_NAMES)
+def test_msh_reader_matches_gmsh(name: str):
+    mesh = import_from_msh_data(read_msh(get_fixture_path(name)))
+
+    gmsh.initialize()
+    try:
+        gmsh.option.set_number("General.Terminal", 0)
+        gmsh.open(get_fixture_path(name))
+        expected_mesh = import_from_gmsh()
+    finally:
+        gmsh.finalize()
+
+    assert_meshes_equal(mesh, expected_mesh)
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+def test_ascii_and_binary_match(dim: int):
+    ascii_msh_data = read_msh(get_fixture_path(f"square_{dim}d_ascii"))
+    binary_msh_data = read_msh(get_fixture_path(f"square_{dim}d_binary"))
+
+    assert ascii_msh_data.version == binary_msh_data.version == "4.1"
+    np.testing.assert_array_equal(ascii_msh_data.node_tags, binary_msh_data.node_tags)
+    # ASCII coordinates are written with 16 significant digits
+    np.testing.assert_allclose(ascii_msh_data.points, binary_msh_data.points, rtol=0, atol=1e-15)
+    assert ascii_msh_data.physical_names == binary_msh_data.physical_names
+    assert ascii_msh_data.entity_physical_tags == binary_msh_data.entity_physical_tags
+    assert len(ascii_msh_data.element_blocks) == len(binary_msh_data.element_blocks)
+    for ascii_block, binary_block in zip(ascii_msh_data.element_blocks, binary_msh_data.element_blocks):
+        assert (ascii_block.dim, ascii_block.entity_tag, ascii_block.element_type) == (binary_block.dim, binary_block.entity_tag, binary_block.element_type)
+        np.testing.assert_array_equal(ascii_block.node_tags, binary_block.node_tags)
+
+
+def test_import_from_msh_without_gmsh():
+    mesh = import_from_msh(get_fixture_path("square_3d_binary"))
+
+    assert not gmsh.is_initialized()
+    assert mesh.dim == 3
+    assert set(mesh.element_types) == {ElementType.PRISM}
+    assert set(mesh.markers) == {"bottom", "top", "lower", "outlet", "upper", "inlet", "wall"}
+    assert len(mesh.markers["bottom"]) == len(mesh.markers["top"]) == len(mesh.elements) // 2
@@ -0,0 +1,53 @@
+"""
+Tests of meshing in worker processes with the asyncio MeshingService.
+"""
+import asyncio
+from typing import List
+import numpy as np
+import pytest
+from ezmesh import CurveLoop, PlaneSurface
+from ezmesh.service import MeshingProgress, MeshingService
+from ezmesh.utils.shapes import generate_circle
+
+
+def get_circle_surface(mesh_size: float = 0.1):
+    curve_loop = CurveLoop.from_coords(generate_circle(1, num_points=40)[:-1], mesh_size=mesh_size, label="wall")
+    return PlaneSurface(outlines=[curve_loop])
+
+
+def test_generate_reports_progress():
+    service = MeshingService(max_workers=1)
+    events: List[MeshingProgress] = []
+    mesh = asyncio.run(service.generate(get_circle_surface(), on_progress=events.append))
+
+    assert len(mesh.elements) > 0
+    assert set(mesh.markers) == {"wall"}
+    phases = [event.phase for event in events]
+    assert "2D" in phases and phases[-1] == "done"
+    assert events[-1].num_elements is not None and events[-1].num_elements > 0
+
+
+def test_consecutive_event_loops():
+    service = MeshingService(max_workers=1)
+    first_mesh = asyncio.run(service.generate(get_circle_surface()))
+    second_mesh = asyncio.run(service.generate(get_circle_surface()))
+
+    np.testing.assert_array_equal(first_mesh.points, second_mesh.points)
+
+
+def test_timeout_kills_worker():
+    service = MeshingService(max_workers=1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.generate(get_circle_surface(0.002), timeout=0.05))
+    assert service.num_jobs == 0
+
+
+def test_full_queue_rejects_jobs():
+    service = MeshingService(max_workers=1, max_queue_size=1)
+
+    async def generate_all():
+        return await asyncio.gather(*[service.generate(get_circle_surface()) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(generate_all())
+    assert sum(isinstance(result, asyncio.QueueFull) for result in results) == 1
+    assert sum(not isinstance(result, BaseException) for result in results) == 2
@@ -0,0 +1,81 @@
+"""
+Tests of the threshold, curvature and background mesh size fields.
+"""
+from typing import List, Optional
+import gmsh
+import numpy as np
+import pytest
+from ezmesh import CurveLoop, Geometry, PlaneSurface
+from ezmesh.geometry import BackgroundMeshField, CurvatureField, SurfaceField, ThresholdField
+from ezmesh.mesh import Mesh
+from ezmesh.utils.shapes import generate_circle, generate_naca4_airfoil
+
+
+def get_circle_surface(fields: Optional[List[SurfaceField]] = None, mesh_size: float = 0.2):
+    curve_loop = CurveLoop.from_coords(generate_circle(1, num_points=40)[:-1], mesh_size=mesh_size, label="wall")
+    return PlaneSurface(outlines=[curve_loop], fields=fields or [])
+
+
+def generate(surface: PlaneSurface):
+    with Geometry() as geometry:
+        gmsh.option.set_number("General.Terminal", 0)
+        return geometry.generate(surface)
+
+
+def get_cell_extents(mesh: Mesh):
+    "get the (num_elements, 2) extent of each element along x and y"
+    cell_points = mesh.points[np.stack(mesh.elements)][:, :, :2]
+    return cell_points.max(axis=1) - cell_points.min(axis=1)
+
+
+def test_threshold_field_refines_near_labels():
+    mesh = generate(get_circle_surface([ThresholdField(["wall"], size_min=0.02, size_max=0.2, dist_min=0.0, dist_max=0.5)]))
+
+    radii = np.linalg.norm(mesh.get_cell_centroids()[:, :2], axis=1)
+    extents = get_cell_extents(mesh).max(axis=1)
+    assert extents[radii > 0.95].mean() < 0.5*extents[radii < 0.3].mean()
+
+
+def test_curvature_field_refines_leading_edge():
+    airfoil_curve_loop = CurveLoop.from_coords(generate_naca4_airfoil("0012", num_points=80), mesh_size=0.2, label="airfoil")
+    farfield_curve_loop = CurveLoop.from_coords(generate_circle(3, num_points=20)[:-1], mesh_size=1.0, label="farfield", holes=[airfoil_curve_loop])
+    mesh = generate(PlaneSurface(outlines=[farfield_curve_loop], fields=[CurvatureField(size_min=0.005, size_max=1.0)]))
+
+    airfoil_points = mesh.points[np.unique(np.concatenate(mesh.markers["airfoil"]))]
+    leading_edge_spacing = np.sort(np.linalg.norm(airfoil_points[:, :2] - airfoil_points[np.argmin(airfoil_points[:, 0]), :2], axis=1))[1]
+    assert leading_edge_spacing < 0.05
+
+    radii = np.linalg.norm(mesh.get_cell_centroids()[:, :2] - [0.5, 0.0], axis=1)
+    extents = get_cell_extents(mesh).max(axis=1)
+    assert extents[radii > 2].mean() > 5*extents[radii < 0.6].mean()
+
+
+def test_background_mesh_field_metric_is_anisotropic():
+    background_mesh = generate(get_circle_surface())
+    metric = np.zeros((len(background_mesh.points), 3, 3))
+    metric[:, 0, 0], metric[:, 1, 1], metric[:, 2, 2] = 1/0.02**2, 1/0.2**2, 1/0.2**2
+
+    mesh = generate(get_circle_surface([BackgroundMeshField(background_mesh, metric, is_size_from_points=False)]))
+
+    mean_extents = get_cell_extents(mesh).mean(axis=0)
+    assert mean_extents[1] > 3*mean_extents[0]
+
+
+def test_background_mesh_field_restores_options():
+    background_mesh = generate(get_circle_surface())
+    sizes = np.full(len(background_mesh.points), 0.1)
+    with Geometry() as geometry:
+        gmsh.option.set_number("General.Terminal", 0)
+        geometry.generate(get_circle_surface([BackgroundMeshField(background_mesh, sizes, is_size_from_points=False)]))
+        assert gmsh.option.get_number("Mesh.MeshSizeFromPoints") == 1
+        assert gmsh.option.get_number("Mesh.MeshSizeFromCurvature") == 0
+        assert gmsh.option.get_number("Mesh.Algorithm") == 6
+
+
+def test_metric_field_with_other_fields_raises():
+    background_mesh = generate(get_circle_surface())
+    metric = np.tile(np.eye(3)/0.1**2, (len(background_mesh.points), 1, 1))
+    surface = get_circle_surface([BackgroundMeshField(background_mesh, metric), ThresholdField(["wall"], size_min=0.02, size_max=0.2)])
+    with pytest.raises(ValueError):
+        generate(surface)
+    assert not surface.before_sync_initiated